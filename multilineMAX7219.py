@@ -49,6 +49,10 @@
 #	2  5  8  11
 #	1  4  7  10
 #	0  3  6  9	
+#   The matrices are wired along the chain in this order by default (matrix 0 nearest
+#   the Pi); for other wiring (along the rows, serpentine, or modules mounted rotated)
+#   set MATRIX_ORDER and MATRIX_ROTATION below, or give a Display a Topology: the
+#   functions keep using the numbering above
 # - gfx_ (graphics-based) functions use an x,y coordinate system
 #   to address individual LEDs:
 #     x=0 (left-hand column) to x=8*MATRIX_WIDTH-1 (right-hand column)
@@ -81,7 +85,10 @@
 # Requires:
 # - python-dev & py-spidev modules, see install instructions
 #   at www.100randomtasks.com/simple-spi-on-raspberry-pi
+#   (not needed with the FakeTransport or RecordingTransport
+#   of multilineMAX7219_transport.py, eg for testing without hardware)
 # - MAX7219fonts.py file containing font bitmaps
+# - multilineMAX7219_transport.py file containing the transports
 # - User should also set MATRIX_HEIGHT and MATRIX_WIDTH variables below 
 # 	to the appropriate value for the setup in use.  Failure to do
 #   this will prevent the library functions working properly
@@ -89,6 +96,8 @@
 # The functions from spidev used in this library are:
 #   xfer()  : send bytes deasserting CS/CE after every byte
 #   xfer2() : send bytes only de-asserting CS/CE at end
+# They are called on the transport (see set_transport()), which by
+#   default is SPI bus#0 using CS0 (CE0), opened on first use
 # ---------------------------------------------------------
 # The variables MATRIX_HEIGHT and MATRIX_WIDTH, defined in the 
 #	multilineMAX7219.py library script, should always be set to be 
@@ -97,25 +106,48 @@
 # ---------------------------------------------------------
 # See further documentation of each library function below
 # Also see multilineMAX7219_demo.py script for examples of use
+# Awaitable versions of the animation functions, for use with asyncio,
+#   are in multilineMAX7219_async.py
 # MAX7219 datasheet gives full details of operation of the
 # LED driver chip
 # ---------------------------------------------------------
 
-import spidev
+import functools
+import threading
 import time
-from random import randrange
+from collections import OrderedDict
+from random import randrange, Random
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # Note: If any additional fonts are added in multilineMAX7219_fonts.py, add them to the import list here:
 #       Also add them to the section at the end of this script that parses command line arguments
 from multilineMAX7219_fonts import CP437_FONT, SINCLAIRS_FONT, LCD_FONT, TINY_FONT
+from multilineMAX7219_transport import SpidevTransport
 
 # IMPORTANT: User must specify the number of MAX7219 matrices here:
 MATRIX_WIDTH  = 3
 MATRIX_HEIGHT = 3
 
+# Optional: The order in which the matrices are wired along the chain: COLUMN_MAJOR (up each column of matrices, as
+# numbered above), ROW_MAJOR (along each row, left to right, bottom row first) or SERPENTINE (along the bottom row
+# left to right, back along the next row right to left, and so on); and the rotation of the modules, clockwise in
+# degrees (0, 90, 180 or 270), for all of them or as a list per matrix (see Topology)
+MATRIX_ORDER    = 'column_major'
+MATRIX_ROTATION = 0
+
 # Optional: It is also possible to change the default font for all the library functions:
 DEFAULT_FONT = CP437_FONT          # Note: some fonts only contain characters in chr(32)-chr(126) range
 
+# Optional: The number of vertical message transitions kept ready to send by each display (see scroll_message_vert())
+VERT_FRAMES_CACHE_SIZE = 32
+
+# Optional: Keep the graphics buffer in a NumPy array, which speeds up the gfx_ functions on large arrays
+# (the pure Python buffer is used if NumPy is not installed)
+GFX_NUMPY = False
+
 # ---------------------------------------------------------
 # Should not need to change anything below here
 # ---------------------------------------------------------
@@ -123,12 +155,12 @@ DEFAULT_FONT = CP437_FONT          # Note: some fonts only contain characters in
 NUM_MATRICES  = MATRIX_WIDTH * MATRIX_HEIGHT 
 PAD_STRING   = " " * NUM_MATRICES  # String for trimming text to fit
 NO_OP        = [0,0]               # 'No operation' tuple: 0x00 sent to register MAX_7219_NOOP
+BLANK_COLUMNS = (0,) * 8           # The column bytes of a cleared matrix
 MATRICES     = range(NUM_MATRICES) # List of available matrices for validation
 
 # Graphics setup
 gfx_rows    = range(MATRIX_HEIGHT * 8)
 gfx_columns = range(MATRIX_WIDTH * 8)
-gfx_buffer  = [[0 for x1 in xrange(MATRIX_HEIGHT*8)] for x2 in xrange(MATRIX_WIDTH*8)]
 
 # Registers in the MAX7219 matrix controller (see datasheet)
 MAX7219_REG_NOOP        = 0x0
@@ -152,633 +184,2104 @@ DIR_U      = 1   # Up
 DIR_R      = 2   # Right
 DIR_D      = 4   # Down
 DIR_L      = 8   # Left
-DIR_RU     = 3   # Right & up diagonal scrolling for gfx_scroll() function only
-DIR_RD     = 6   # Right & down diagonal scrolling for gfx_scroll() function only
-DIR_LU     = 9   # Left & up diagonal scrolling for gfx_scroll() function only
-DIR_LD     = 12  # Left & down diagonal scrolling for gfx_scroll() function only
+DIR_RU     = 3   # Right & up diagonal scrolling for gfx_scroll() & gfx_scroll_towards() functions only
+DIR_RD     = 6   # Right & down diagonal scrolling for gfx_scroll() & gfx_scroll_towards() functions only
+DIR_LU     = 9   # Left & up diagonal scrolling for gfx_scroll() & gfx_scroll_towards() functions only
+DIR_LD     = 12  # Left & down diagonal scrolling for gfx_scroll() & gfx_scroll_towards() functions only
 DISSOLVE   = 16  # Pseudo-random fade transition for wipe_message() function only
 GFX_OFF    = 0   # Turn the relevant LEDs off, or omit (don't draw) the endpoint of a line
 GFX_ON     = 1   # Turn the relevant LEDs on, or include (draw) the endpoint of a line
 GFX_INVERT = 2   # Invert the state of the relevant LEDs
 
-# Open SPI bus#0 using CS0 (CE0)
-spi = spidev.SpiDev()
-spi.open(0,0)
+# Orders of the matrices along the chain, see MATRIX_ORDER
+COLUMN_MAJOR = 'column_major'
+ROW_MAJOR    = 'row_major'
+SERPENTINE   = 'serpentine'
 
-# ---------------------------------------
-# Library function definitions begin here
-# ---------------------------------------
+# Frame hook events, see Display.add_frame_hook()
+BEFORE_PACK    = 'before_pack'     # Before a frame is packed (generated)
+AFTER_PACK     = 'after_pack'      # After a frame has been packed, before it is sent
+AFTER_TRANSFER = 'after_transfer'  # After a frame has been sent
 
-def send_reg_byte(register, data):
-    # Send one byte of data to one register via SPI port, then raise CS to latch
-    # Note that subsequent sends will cycle this tuple through to successive MAX7219 chips
-    spi.xfer([register, data])
-
-def send_bytes(datalist):
-    # Send sequence of bytes (should be [register,data] tuples) via SPI port, then raise CS
-    # Included for ease of remembering the syntax rather than the native spidev command, but also to avoid reassigning to 'datalist' argument
-    spi.xfer2(datalist[:])
-
-def send_matrix_reg_byte(matrix, register, data):
-    # Send one byte of data to one register in just one MAX7219 without affecting others
-    if matrix in MATRICES:
-        padded_data = NO_OP * (NUM_MATRICES - 1 - matrix) + [register, data] + NO_OP * matrix
-        send_bytes(padded_data)
-
-def send_all_reg_byte(register, data):
-    # Send the same byte of data to the same register in all of the MAX7219 chips
-    send_bytes([register, data] * NUM_MATRICES)
-
-def clear(matrix_list):
-    # Clear one or more specified MAX7219 matrices (argument(s) to be specified as a list even if just one)
-    for matrix in matrix_list:
-        if matrix in MATRICES:
-            for col in range(8):
-                send_matrix_reg_byte(matrix, col+1, 0)
-
-def clear_all():
-    # Clear all of the connected MAX7219 matrices
-    for col in range(8):
-        send_all_reg_byte(col+1, 0)
-
-def brightness(intensity):
-    # Set a specified brightness level on all of the connected MAX7219 matrices
-    # Intensity: 0-15 with 0=dimmest, 15=brightest; in practice the full range does not represent a large difference
-    intensity = int(max(0, min(15, intensity)))
-    send_bytes([MAX7219_REG_INTENSITY, intensity] * NUM_MATRICES)
-
-	
-def send_matrix_letter(matrix, char_code, font=DEFAULT_FONT):
-    # Send one character from the specified font to a specified MAX7219 matrix
-    if matrix in MATRICES:
-        for col in range(8):
-            send_matrix_reg_byte(matrix, col+1, font[char_code % 0x100][col])
-
-def send_matrix_shifted_letter(matrix, curr_code, next_code, progress, direction=DIR_L, font=DEFAULT_FONT):
-    # Send to one MAX7219 matrix a combination of two specified characters, representing a partially-scrolled position
-    # progress: 0-7: how many pixels the characters are shifted: 0=curr_code fully displayed; 7=one pixel less than fully shifted to next_code
-    # With multiple matrices, this function sends many NO_OP tuples, limiting the scrolling speed achievable for a whole line
-    # scroll_message_horiz() and scroll_message_vert() are more efficient and can scroll a whole line of text faster
-    curr_char = font[curr_code % 0x100]
-    next_char = font[next_code % 0x100]
-    show_char = [0,0,0,0,0,0,0,0]
-    progress  = progress % 8
-    if matrix in MATRICES:
-        if direction == DIR_L:
-            for col in range(8):
-                if col+progress < 8:
-                    show_char[col] = curr_char[col+progress]
+# Average number of rows the columns of gfx_effect_rain() fall by per frame (2-5 rows, at random), which sets its
+# speed with a FrameScheduler.pps()
+RAIN_PIXELS_PER_FRAME = 3.5
+
+# Lookup tables for bytes in the graphics buffer: bits in reverse order, and all bits inverted
+BIT_REVERSE  = bytearray(int('{0:08b}'.format(b)[::-1], 2) for b in range(256))
+INVERT_TABLE = bytes(bytearray(b ^ 0xFF for b in range(256)))
+
+class GfxBuffer(object):
+    # Graphics buffer for an array of width x height matrices, packed into a bytearray in the MAX7219 wire format:
+    # - one byte per column of each matrix, the same as the font data: MSB (bottom row) to LSB (top row)
+    # - data[col*num_matrices + matrix] holds column col (0-7) of that matrix, so the bytes for register col+1
+    #   of all the matrices are one slice of data, and the bytes of one x column are adjacent (one per matrix row)
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.num_matrices = width * height
+        self.columns = range(width * 8)
+        self.rows = range(height * 8)
+        self.data = bytearray(8 * self.num_matrices)
+
+    def col_index(self, g_x):
+        # Index in data of the byte holding the bottom 8 pixels of column g_x
+        return (g_x % 8) * self.num_matrices + (g_x // 8) * self.height
+
+    def get_px(self, g_x, g_y):
+        # Return the state (on=1, off=0) of an individual pixel; no bounds checks
+        return (self.data[self.col_index(g_x) + g_y // 8] >> (7 - g_y % 8)) & 0x01
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __getitem__(self, g_x):
+        # Return column g_x as a list of pixel states, so that buffer[x][y] reads like the 2d array of earlier
+        # versions (read-only: changing the list does not change the buffer)
+        g_x = self.columns[g_x]
+        return [self.get_px(g_x, g_y) for g_y in self.rows]
+
+    def put_px(self, g_x, g_y, value):
+        # Set an individual pixel to value (1 or 0); no bounds checks
+        idx = self.col_index(g_x) + g_y // 8
+        if value:
+            self.data[idx] |= 0x80 >> (g_y % 8)
+        else:
+            self.data[idx] &= ~(0x80 >> (g_y % 8)) & 0xFF
+
+    def set_px(self, g_x, g_y, state=GFX_INVERT):
+        # Set an individual pixel to on, off, or the inverse of its previous state
+        if (g_x in self.columns) and (g_y in self.rows):
+            idx = self.col_index(g_x) + g_y // 8
+            if state == GFX_ON:
+                self.data[idx] |= 0x80 >> (g_y % 8)
+            elif state == GFX_OFF:
+                self.data[idx] &= ~(0x80 >> (g_y % 8)) & 0xFF
+            elif state == GFX_INVERT:
+                self.data[idx] ^= 0x80 >> (g_y % 8)
+
+    def set_col(self, g_x, state=GFX_INVERT):
+        # Set an entire column to on, off, or the inverse of its previous state
+        if g_x in self.columns:
+            idx = self.col_index(g_x)
+            if state == GFX_ON:
+                self.data[idx:idx+self.height] = b'\xff' * self.height
+            elif state == GFX_OFF:
+                self.data[idx:idx+self.height] = bytearray(self.height)
+            elif state == GFX_INVERT:
+                self.data[idx:idx+self.height] = self.data[idx:idx+self.height].translate(INVERT_TABLE)
+
+    def set_all(self, state=GFX_INVERT):
+        # Set the entire buffer to on, off, or the inverse of its previous state
+        if state == GFX_ON:
+            self.data[:] = b'\xff' * len(self.data)
+        elif state == GFX_OFF:
+            self.data[:] = bytearray(len(self.data))
+        elif state == GFX_INVERT:
+            self.data[:] = self.data.translate(INVERT_TABLE)
+
+    def get_column(self, g_x):
+        # Return column g_x as a list of pixel states, bottom row first
+        idx = self.col_index(g_x)
+        return [(self.data[idx + g_y // 8] >> (7 - g_y % 8)) & 0x01 for g_y in self.rows]
+
+    def put_column(self, g_x, pixels):
+        # Set column g_x from a list of pixel states, bottom row first (missing pixels are turned off)
+        idx = self.col_index(g_x)
+        for band in range(self.height):
+            val = 0
+            for px, bit in enumerate(pixels[band*8:band*8+8]):
+                if bit:
+                    val |= 0x80 >> px
+            self.data[idx + band] = val
+
+    def blit_col(self, g_x, start_y, bits, mask, state=GFX_INVERT):
+        # Combine a column of pixels with column g_x, starting at row start_y
+        # bits: the pixels as an integer, bit 0 = pixel at start_y; mask: the pixels affected by GFX_ON
+        # GFX_ON copies the pixels within the mask, GFX_OFF turns off and GFX_INVERT inverts the pixels set in bits
+        if g_x not in self.columns or not mask:
+            return
+        idx = self.col_index(g_x)
+        for band in range(max(0, start_y // 8), min(self.height, (start_y + mask.bit_length() + 7) // 8)):
+            shift = band*8 - start_y
+            if shift >= 0:
+                val, val_mask = BIT_REVERSE[(bits >> shift) & 0xFF], BIT_REVERSE[(mask >> shift) & 0xFF]
+            else:
+                val, val_mask = BIT_REVERSE[(bits << -shift) & 0xFF], BIT_REVERSE[(mask << -shift) & 0xFF]
+            if state == GFX_ON:
+                self.data[idx + band] = (self.data[idx + band] & ~val_mask & 0xFF) | (val & val_mask)
+            elif state == GFX_OFF:
+                self.data[idx + band] &= ~val & 0xFF
+            elif state == GFX_INVERT:
+                self.data[idx + band] ^= val
+
+    def blit_sprite(self, sprite, start_x, start_y, state=GFX_INVERT):
+        # Combine a 2d array[x][y] of pixels with the buffer at the specified position (see blit_col() for the states)
+        for l_col in range(len(sprite)):
+            bits = 0
+            for l_row, px in enumerate(sprite[l_col]):
+                if px:
+                    bits |= 1 << l_row
+            self.blit_col(l_col + start_x, start_y, bits, (1 << len(sprite[l_col])) - 1, state)
+
+    def blit_glyph(self, compiled_font, char_code, start_x, start_y, state=GFX_INVERT):
+        # Combine one character of a CompiledFont with the buffer (GFX_ON copies the whole 8x8 character cell)
+        for l_col, bits in enumerate(compiled_font.rev_cols[char_code]):
+            self.blit_col(l_col + start_x, start_y, bits, 0xFF, state)
+
+    def blit_compiled(self, sprite, start_x, start_y, state=GFX_INVERT):
+        # Combine a Sprite with the buffer, a byte at a time (see blit_col() for the states)
+        # The sprite is clipped to the buffer once, then each byte is combined with its mask by OR, AND or XOR
+        first_band = start_y // 8
+        columns = sprite.columns(start_y % 8)
+        data = self.data
+        for l_col in range(max(0, -start_x), min(sprite.width, len(self.columns) - start_x)):
+            values, masks = columns[l_col]
+            idx = self.col_index(start_x + l_col) + first_band
+            for band in range(max(0, -first_band), min(len(values), self.height - first_band)):
+                if state == GFX_ON:
+                    data[idx + band] = (data[idx + band] & ~masks[band] & 0xFF) | values[band]
+                elif state == GFX_OFF:
+                    data[idx + band] &= ~values[band] & 0xFF
+                elif state == GFX_INVERT:
+                    data[idx + band] ^= values[band]
+
+    def plot(self, points, state=GFX_INVERT):
+        # Set a sequence of (g_x, g_y) pixels to on, off, or the inverse of their previous state
+        # The pixels must lie within the buffer, and each appear only once
+        data, num_matrices, height = self.data, self.num_matrices, self.height
+        if state == GFX_ON:
+            for g_x, g_y in points:
+                data[(g_x % 8) * num_matrices + (g_x // 8) * height + g_y // 8] |= 0x80 >> (g_y % 8)
+        elif state == GFX_OFF:
+            for g_x, g_y in points:
+                data[(g_x % 8) * num_matrices + (g_x // 8) * height + g_y // 8] &= ~(0x80 >> (g_y % 8)) & 0xFF
+        elif state == GFX_INVERT:
+            for g_x, g_y in points:
+                data[(g_x % 8) * num_matrices + (g_x // 8) * height + g_y // 8] ^= 0x80 >> (g_y % 8)
+
+    def span_x(self, g_y, start_x, end_x, state=GFX_INVERT):
+        # Set the pixels from start_x to end_x (inclusive) of row g_y; the span must lie within the buffer
+        self.plot([(g_x, g_y) for g_x in range(start_x, end_x + 1)], state)
+
+    def span_y(self, g_x, start_y, end_y, state=GFX_INVERT):
+        # Set the pixels from start_y to end_y (inclusive) of column g_x, a byte at a time; the span must lie within
+        # the buffer
+        idx = self.col_index(g_x)
+        for band, mask in self.band_masks(start_y, end_y - start_y + 1):
+            if state == GFX_ON:
+                self.data[idx + band] |= mask
+            elif state == GFX_OFF:
+                self.data[idx + band] &= ~mask & 0xFF
+            elif state == GFX_INVERT:
+                self.data[idx + band] ^= mask
+
+    def fill_rect(self, start_x, start_y, end_x, end_y, state=GFX_INVERT):
+        # Set all the pixels of a rectangle (corners inclusive, start <= end) lying within the buffer
+        for g_x in range(start_x, end_x + 1):
+            self.span_y(g_x, start_y, end_y, state)
+
+    def band_masks(self, start_y, extent_y):
+        # Return the (band, mask byte) of each band of a column overlapping the rows start_y to start_y+extent_y-1
+        end_y = start_y + extent_y - 1
+        return [(band, (0xFF >> max(start_y - band*8, 0)) & (0xFF << (7 - min(end_y - band*8, 7))) & 0xFF)
+                for band in range(start_y // 8, end_y // 8 + 1)]
+
+    def get_column_bits(self, g_x):
+        # Return column g_x as an integer, bit 0 = bottom row
+        idx = self.col_index(g_x)
+        bits = 0
+        for band in range(self.height):
+            bits |= BIT_REVERSE[self.data[idx + band]] << 8*band
+        return bits
+
+    def put_column_bits(self, g_x, bits, masks=None):
+        # Set column g_x from an integer (bit 0 = bottom row); masks: optional band_masks() limiting the rows set
+        idx = self.col_index(g_x)
+        if masks is None:
+            self.data[idx:idx+self.height] = bytearray(BIT_REVERSE[(bits >> 8*band) & 0xFF]
+                                                       for band in range(self.height))
+            return
+        for band, mask in masks:
+            self.data[idx + band] = (self.data[idx + band] & ~mask & 0xFF) | \
+                                    (BIT_REVERSE[(bits >> 8*band) & 0xFF] & mask)
+
+    def scroll(self, direction, new_graphic, start_x, extent_x, start_y, extent_y, distance):
+        # Scroll the rectangle by distance pixels, filling the gap from new_graphic: GFX_ON, GFX_OFF or a 2d array of
+        # extent_x x extent_y (missing pixels are off), of which only the incoming edge is read
+        # The rectangle must lie within the buffer
+        distance_x = min(distance, extent_x)
+        distance_y = min(distance, extent_y)
+        if direction & DIR_L:
+            columns_in = graphic_edge(new_graphic, range(distance_x), 0, extent_y)
+        else:
+            columns_in = graphic_edge(new_graphic, range(extent_x - distance_x, extent_x), 0, extent_y)
+        if direction & DIR_U:
+            rows_in = graphic_edge(new_graphic, range(extent_x), extent_y - distance_y, distance_y)
+        else:
+            rows_in = graphic_edge(new_graphic, range(extent_x), 0, distance_y)
+        self.scroll_packed(direction, start_x, extent_x, start_y, extent_y, distance, columns_in, rows_in)
+
+    def scroll_packed(self, direction, start_x, extent_x, start_y, extent_y, distance, columns_in=None, rows_in=None):
+        # Scroll the rectangle (which must lie within the buffer) by distance pixels in direction (any of DIR_U,
+        # DIR_D, DIR_L, DIR_R and the diagonals, which scroll horizontally first), filling the gap from packed edges:
+        # - columns_in: the columns entering the rectangle horizontally, left to right, as integers (bit 0 = the
+        #   bottom row of the rectangle)
+        # - rows_in: for each column of the rectangle, left to right, the rows entering it vertically as an integer
+        #   (bit 0 = the lowest of them)
+        # None for either fills the gap with off pixels
+        # Columns move as whole bytes (masked at the top and bottom of the rectangle), rows by shifting each column
+        distance_x = min(distance, extent_x)
+        distance_y = min(distance, extent_y)
+        masks = self.band_masks(start_y, extent_y)
+        data, height = self.data, self.height
+        if distance_x and direction & (DIR_L | DIR_R):
+            if direction & DIR_L:
+                moves = [(g_x, g_x + distance_x) for g_x in range(start_x, start_x + extent_x - distance_x)]
+                first_in = start_x + extent_x - distance_x
+            else:
+                moves = [(g_x, g_x - distance_x) for g_x in reversed(range(start_x + distance_x, start_x + extent_x))]
+                first_in = start_x
+            full_height = extent_y == len(self.rows)
+            for dst_x, src_x in moves:
+                dst, src = self.col_index(dst_x), self.col_index(src_x)
+                if full_height:
+                    data[dst:dst+height] = data[src:src+height]
                 else:
-                    show_char[col] = next_char[col+progress-8]
-                send_matrix_reg_byte(matrix, col+1, show_char[col])
-        elif direction == DIR_R:
-            for col in range(8):
-                if col >= progress:
-                    show_char[col] = curr_char[col-progress]
+                    for band, mask in masks:
+                        data[dst + band] = (data[dst + band] & ~mask & 0xFF) | (data[src + band] & mask)
+            for l_col in range(distance_x):
+                self.put_column_bits(first_in + l_col, (columns_in[l_col] if columns_in else 0) << start_y, masks)
+        if distance_y and direction & (DIR_U | DIR_D):
+            region = ((1 << extent_y) - 1) << start_y
+            for l_col in range(extent_x):
+                bits = self.get_column_bits(start_x + l_col) & region
+                incoming = rows_in[l_col] if rows_in else 0
+                if direction & DIR_U:
+                    bits = ((bits << distance_y) & region) | (incoming << start_y)
                 else:
-                    show_char[col] = next_char[col-progress+8]
-                send_matrix_reg_byte(matrix, col+1, show_char[col])
-        elif direction == DIR_U:
-            for col in range(8):
-                show_char[col] = (curr_char[col] >> progress) + (next_char[col] << (8-progress))
-                send_matrix_reg_byte(matrix, col+1, show_char[col])
-        elif direction == DIR_D:
-            for col in range(8):
-                show_char[col] = (curr_char[col] << progress) + (next_char[col] >> (8-progress))
-                send_matrix_reg_byte(matrix, col+1, show_char[col])
-
-def static_message(message, direction=DIR_RD, delay=0, font=DEFAULT_FONT):
-    # Send a stationary text message to the array of MAX7219 matrices
-    # Message will be truncated from the right to fit the array
-	# Message can be send in this directions:	DIR_RD	DIR_RU	DIR_D	DIR_U
-	# (e.g. message='012345678')				0 1 2 	6 7 8	0 3 6	2 5 8
-	#											3 4 5	3 4 5	1 4 7	1 4 7
-	#											6 7 8	0 1 2	2 5 8	0 3 6
-	# delay = x seconds can delay the appearance of the following character
-	message = trim(message)
-	delay = delay
-	idx = 0
-	if direction == DIR_RD or direction == DIR_R:
-		for l_row in reversed(range(MATRIX_HEIGHT)):
-			for l_col in range(MATRIX_WIDTH):
-				matrix = l_row + l_col*MATRIX_HEIGHT
-				send_matrix_letter( matrix, ord(message[idx] ), font)
-				idx += 1
-				time.sleep(delay)
-	elif direction == DIR_RU:
-		for l_row in range(MATRIX_HEIGHT):
-			for l_col in range(MATRIX_WIDTH):
-				matrix = l_row + l_col*MATRIX_HEIGHT
-				send_matrix_letter( matrix, ord(message[idx] ), font)
-				idx += 1
-				time.sleep(delay)
-	elif direction == DIR_D:
-		for l_col in range(MATRIX_WIDTH):
-			for l_row in reversed(range(MATRIX_HEIGHT)):
-				matrix = l_row + l_col*MATRIX_HEIGHT
-				send_matrix_letter( matrix, ord(message[idx] ), font)
-				idx += 1
-				time.sleep(delay)
-	elif direction == DIR_U:
-		for l_col in range(MATRIX_WIDTH):
-			for l_row in range(MATRIX_HEIGHT):
-				matrix = l_row + l_col*MATRIX_HEIGHT
-				send_matrix_letter( matrix, ord(message[idx] ), font)
-				idx += 1
-				time.sleep(delay)
-	
-def scroll_message_horiz(messages, repeats=0, speed=3, direction=DIR_L, font=DEFAULT_FONT, finish=True):
-    # Scroll some text messages across the lines, for a specified number of times (repeats)
-    # repeats=0 gives indefinite scrolling until script is interrupted
-    # speed: 0-9 for practical purposes; speed does not have to integral
-    # direction: DIR_L or DIR_R only; DIR_U & DIR_D will do nothing
-    # finish: True/False - True ensures array is clear at end, False ends with the last columns of the messages
-    #   still displayed on the array - this is included for completeness but rarely likely to be required in practice
-    # Scrolling starts with messages off the RHS(DIR_L)/LHS(DIR_R) of array, and ends with messages off the LHS/RHS
-    # If repeats>1, add space(s) at the ends 'message' in each row to separate the end of messages & start of its repeat
-	delay = 0.5 ** speed
-	if repeats <= 0:
-		indef = True
-	else:
-		indef = False
-		repeats = int(repeats)
-	longest_msg = max( [len(m) for m in messages] )
-	for row in range(len(messages)):
-		if len(messages[row]) < longest_msg:
-			messages[row] = trim(messages[row], longest_msg)
-	messages = messages * MATRIX_HEIGHT
-	messages = messages[:MATRIX_HEIGHT]
-	# Repeatedly scroll the whole message (initially 'front-padded' with blanks) until the last char appears
-	if direction == DIR_L:
-		scroll_texts = [PAD_STRING[:MATRIX_WIDTH] + m for m in messages ]
-	elif direction == DIR_R:
-		scroll_texts = [m + PAD_STRING[:MATRIX_WIDTH] for m in messages ]
-	counter = repeats
-	while (counter > 0) or indef:
-		scroll_text_once(scroll_texts, delay, direction, font)
-		# After the first scroll, replace the blank 'front-padding' with the start of the same messages
-		if counter == repeats:
-			if direction == DIR_L:
-				scroll_texts = [ m[-MATRIX_WIDTH:] + m for m in messages]
-			elif direction == DIR_R:
-				scroll_texts = [ m + m[:MATRIX_WIDTH] for m in messages]
-		counter -= 1
-	# To finish, 'end-pad' the messages with blanks and scroll the end of the messages off the array
-	if direction == DIR_L:
-		scroll_texts = [ m[-MATRIX_WIDTH:] + PAD_STRING[:MATRIX_WIDTH] for m in messages]
-	elif direction == DIR_R:
-		scroll_texts = [ PAD_STRING[:MATRIX_WIDTH] + m[:MATRIX_WIDTH] for m in messages]
-	scroll_text_once(scroll_texts, delay, direction, font)
-	# Above algorithm leaves the last column of the last character displayed on the array, so optionally erase it
-	if finish:
-		clear_all()
-		
-def scroll_text_once(texts, delay, direction, font):
-    # Subroutine used by scroll_message_horiz(), scrolls texts[line] once across a line , starting & ending with test on the array
-    # Not intended to be used as a user routine; if used, note different syntax: compulsory arguments & requires delay rather than speed
-	length = len(texts[0]) - MATRIX_WIDTH
-	start_range = []
-	if direction == DIR_L:
-		start_range = range(length)
-	elif direction == DIR_R:
-		start_range = range(length-1, -1, -1)
-	for start_char in start_range:
-		for stage in range(8):
-			for col in range(8):
-				column_data = []
-				for matrix in range(NUM_MATRICES):
-					if direction == DIR_L:
-						this_char = font[ord(texts[matrix % MATRIX_HEIGHT][start_char + MATRIX_WIDTH - matrix//MATRIX_HEIGHT - 1])]
-						next_char = font[ord(texts[matrix % MATRIX_HEIGHT][start_char + MATRIX_WIDTH - matrix//MATRIX_HEIGHT])]
-						if col+stage < 8:
-							column_data += [col+1, this_char[col+stage]]
-						else:
-							column_data += [col+1, next_char[col+stage-8]]
-					elif direction == DIR_R:
-						this_char = font[ord(texts[matrix % MATRIX_HEIGHT][start_char + MATRIX_WIDTH - matrix//MATRIX_HEIGHT])]
-						next_char = font[ord(texts[matrix % MATRIX_HEIGHT][start_char + MATRIX_WIDTH - matrix//MATRIX_HEIGHT - 1])]
-						if col >= stage:
-							column_data += [col+1, this_char[col-stage]]
-						else:
-							column_data += [col+1, next_char[col-stage+8]]
-				send_bytes(column_data)
-			time.sleep(delay)
-
-def scroll_message_vert(old_message, new_message, speed=3, direction=DIR_U, font=DEFAULT_FONT, finish=True):
-    # Transitions vertically between two different (truncated if necessary) text messages
-    # speed: 0-9 for practical purposes; speed does not have to integral
-    # direction: DIR_U or DIR_D only; DIR_L & DIR_R will do nothing
-    # finish: True/False : True completely displays new_message at end, False leaves the transition one pixel short
-    # False should be used to ensure smooth scrolling if another vertical scroll is to follow immediately
-	delay = 0.5 ** speed
-	old_message = trim(old_message)
-	new_message = trim(new_message)
-	for iter in range(MATRIX_HEIGHT):
-		for stage in range(8):
-			for col in range(8):
-				column_data=[]
-				for matrix in range(NUM_MATRICES-1, -1, -1):
-					position = (matrix//MATRIX_HEIGHT) + (MATRIX_HEIGHT - 1 - (matrix%MATRIX_WIDTH))*MATRIX_WIDTH
-					scrolled_char = [0,0,0,0,0,0,0,0]
-					if direction == DIR_U:
-						if position + iter*MATRIX_WIDTH < NUM_MATRICES:
-							this_char = font[ord(old_message[position + iter*MATRIX_WIDTH])]
-						else:
-							this_char = font[ord(new_message[position + iter*MATRIX_WIDTH - MATRIX_WIDTH*MATRIX_HEIGHT])]
-						if position + (iter+1)*MATRIX_WIDTH < NUM_MATRICES:
-							next_char = font[ord(old_message[position + (iter+1)*MATRIX_WIDTH])]
-						else:
-							next_char = font[ord(new_message[position + (iter+1)*MATRIX_WIDTH - MATRIX_WIDTH*MATRIX_HEIGHT])]
-						scrolled_char[col] = (this_char[col] >> stage) + (next_char[col] << (8-stage))
-					elif direction == DIR_D:
-						if position - iter*MATRIX_WIDTH < 0:
-							this_char = font[ord(new_message[MATRIX_WIDTH*MATRIX_HEIGHT + position - iter*MATRIX_WIDTH])]
-						else:
-							this_char = font[ord(old_message[position - iter*MATRIX_WIDTH])]
-							
-						if position - (iter+1)*MATRIX_WIDTH < 0:
-							next_char = font[ord(new_message[MATRIX_WIDTH*MATRIX_HEIGHT + position - (iter+1)*MATRIX_WIDTH])]
-						else:
-							next_char = font[ord(old_message[position - (iter+1)*MATRIX_WIDTH])]
-						#scrolled_char[col] = (this_char[col] >> stage) + (next_char[col] << (8-stage))
-						scrolled_char[col] = (this_char[col] << stage) + (next_char[col] >> (8-stage))
-					column_data += [col+1, scrolled_char[col]]
-				send_bytes(column_data)
-			time.sleep(delay)
-	# above algorithm finishes one shift before fully displaying new_message, so optionally complete the display
-	if finish:
-		static_message(new_message)
-
-def trim(text, length=NUM_MATRICES):
-    # Trim or pad specified text to specified length
-    text += " " * length
-    text = text[:length]
-    return text
-
-
-def gfx_set_px(g_x, g_y, state=GFX_INVERT):
-    # Set an individual pixel in the graphics buffer to on, off, or the inverse of its previous state
-    if (g_x in gfx_columns) and (g_y in gfx_rows):
+                    bits = ((bits >> distance_y) & region) | (incoming << (start_y + extent_y - distance_y))
+                self.put_column_bits(start_x + l_col, bits, masks)
+
+    def to_lists(self):
+        # Return the whole buffer as a 2d array[x][y] of pixel states
+        return [self.get_column(g_x) for g_x in self.columns]
+
+    def copy(self):
+        # Return a new buffer of the same kind and size, with the same content
+        other = self.__class__(self.width, self.height)
+        other.copy_from(self)
+        return other
+
+    def copy_from(self, other):
+        # Overwrite the content of the buffer with the content of another buffer of the same kind and size
+        self.data[:] = other.data
+
+    def column_data(self, col):
+        # Return the [register, data] list which sends column col (0-7) of every matrix, furthest matrix first
+        column_data = [col+1, 0] * self.num_matrices
+        column_data[1::2] = self.data[col*self.num_matrices:(col+1)*self.num_matrices][::-1]
+        return column_data
+
+    def frame(self):
+        # Return the column_data() lists for all 8 columns, ie everything needed to display the buffer
+        return [self.column_data(col) for col in range(8)]
+
+class NumpyGfxBuffer(GfxBuffer):
+    # Graphics buffer kept as a 2d NumPy array pixels[x][y] of 0/1 values
+    # Drawing works on slices of the array, and frame() packs all 8 columns with numpy.packbits
+    def __init__(self, width, height):
+        GfxBuffer.__init__(self, width, height)
+        self.data = None
+        self.pixels = numpy.zeros((width * 8, height * 8), dtype=numpy.uint8)
+        # packbits() along y gives one byte per x column and matrix row, ie packed[g_x][band]
+        # wire_index picks these bytes as [col][matrix], furthest matrix first
+        packed_index = numpy.arange(width * 8 * height).reshape(width, 8, height)
+        self.wire_index = packed_index.transpose(1, 0, 2).reshape(8, self.num_matrices)[:, ::-1]
+        self.frame_data = numpy.zeros((8, 2 * self.num_matrices), dtype=numpy.uint8)
+        self.frame_data[:, 0::2] = numpy.arange(1, 9).reshape(8, 1)
+
+    def get_px(self, g_x, g_y):
+        return int(self.pixels[g_x, g_y])
+
+    def __getitem__(self, g_x):
+        return self.pixels[self.columns[g_x]].tolist()
+
+    def put_px(self, g_x, g_y, value):
+        self.pixels[g_x, g_y] = 1 if value else 0
+
+    def set_px(self, g_x, g_y, state=GFX_INVERT):
+        if (g_x in self.columns) and (g_y in self.rows):
+            if state == GFX_ON:
+                self.pixels[g_x, g_y] = 1
+            elif state == GFX_OFF:
+                self.pixels[g_x, g_y] = 0
+            elif state == GFX_INVERT:
+                self.pixels[g_x, g_y] ^= 1
+
+    def set_col(self, g_x, state=GFX_INVERT):
+        if g_x in self.columns:
+            if state == GFX_ON:
+                self.pixels[g_x] = 1
+            elif state == GFX_OFF:
+                self.pixels[g_x] = 0
+            elif state == GFX_INVERT:
+                self.pixels[g_x] ^= 1
+
+    def set_all(self, state=GFX_INVERT):
+        if state == GFX_ON:
+            self.pixels[:] = 1
+        elif state == GFX_OFF:
+            self.pixels[:] = 0
+        elif state == GFX_INVERT:
+            self.pixels ^= 1
+
+    def get_column(self, g_x):
+        return self.pixels[g_x].tolist()
+
+    def put_column(self, g_x, pixels):
+        column = (list(pixels) + [0] * len(self.rows))[:len(self.rows)]
+        self.pixels[g_x] = numpy.array(column, dtype=bool)
+
+    def blit_col(self, g_x, start_y, bits, mask, state=GFX_INVERT):
+        self.blit_sprite([[(bits >> l_row) & 0x01 for l_row in range(mask.bit_length())]], g_x, start_y,
+                         state, [[(mask >> l_row) & 0x01 for l_row in range(mask.bit_length())]])
+
+    def blit_sprite(self, sprite, start_x, start_y, state=GFX_INVERT, mask=None):
+        # mask: optional 2d array of the same shape as sprite, limiting the pixels affected by GFX_ON
+        if len(set(len(l_col) for l_col in sprite)) > 1:
+            # ragged sprite: draw it column by column
+            for l_col in range(len(sprite)):
+                self.blit_sprite(sprite[l_col:l_col+1], start_x + l_col, start_y, state,
+                                 None if mask is None else mask[l_col:l_col+1])
+            return
+        sprite = numpy.array(sprite, dtype=bool)
+        if sprite.size == 0:
+            return
+        sprite = sprite.reshape(len(sprite), -1)
+        mask = numpy.ones(sprite.shape, dtype=bool) if mask is None else numpy.array(mask, dtype=bool)
+        # clip the sprite to the buffer
+        x0, y0 = max(0, -start_x), max(0, -start_y)
+        x1 = min(sprite.shape[0], len(self.columns) - start_x)
+        y1 = min(sprite.shape[1], len(self.rows) - start_y)
+        if x0 >= x1 or y0 >= y1:
+            return
+        sprite, mask = sprite[x0:x1, y0:y1], mask[x0:x1, y0:y1]
+        area = self.pixels[start_x + x0:start_x + x1, start_y + y0:start_y + y1]
         if state == GFX_ON:
-            gfx_buffer[g_x][g_y] = 1
+            area[mask] = sprite[mask]
         elif state == GFX_OFF:
-            gfx_buffer[g_x][g_y] = 0
+            area[sprite] = 0
         elif state == GFX_INVERT:
-            gfx_buffer[g_x][g_y] = (gfx_buffer[g_x][g_y] ^ 1) & 0x01	
+            area ^= sprite
+
+    def blit_compiled(self, sprite, start_x, start_y, state=GFX_INVERT):
+        pixels, mask = sprite.arrays()
+        self.blit_sprite(pixels, start_x, start_y, state, mask)
 
-def gfx_set_col(g_col, state=GFX_INVERT):
-    # Set an entire column in the graphics buffer to on, off, or the inverse of its previous state
-    if (g_col in gfx_columns):
+    def blit_glyph(self, compiled_font, char_code, start_x, start_y, state=GFX_INVERT):
+        rows = numpy.array(compiled_font.rows[char_code], dtype=numpy.uint8)
+        self.blit_sprite(numpy.unpackbits(rows).reshape(8, 8).T, start_x, start_y, state)
+
+    def plot(self, points, state=GFX_INVERT):
+        points = list(points)
+        if not points:
+            return
+        g_xs, g_ys = numpy.array(points, dtype=numpy.intp).T
         if state == GFX_ON:
-			for g_y in range(MATRIX_HEIGHT*8):
-				gfx_buffer[g_col][g_y] = 1
+            self.pixels[g_xs, g_ys] = 1
         elif state == GFX_OFF:
-			for g_y in range(MATRIX_HEIGHT*8):
-				gfx_buffer[g_col][g_y] = 0
+            self.pixels[g_xs, g_ys] = 0
         elif state == GFX_INVERT:
-            for g_y in range(MATRIX_HEIGHT*8):
-				gfx_buffer[g_col][g_y] = gfx_buffer[g_col][g_y] ^ 1
+            self.pixels[g_xs, g_ys] ^= 1
+
+    def span_x(self, g_y, start_x, end_x, state=GFX_INVERT):
+        self.fill_rect(start_x, g_y, end_x, g_y, state)
+
+    def span_y(self, g_x, start_y, end_y, state=GFX_INVERT):
+        self.fill_rect(g_x, start_y, g_x, end_y, state)
 
-def gfx_set_all(state=GFX_INVERT):
-    # Set the entire graphics buffer to on, off, or the inverse of its previous state
-    for g_col in gfx_columns:
+    def fill_rect(self, start_x, start_y, end_x, end_y, state=GFX_INVERT):
+        area = self.pixels[start_x:end_x + 1, start_y:end_y + 1]
         if state == GFX_ON:
-            for g_y in range(MATRIX_HEIGHT*8):
-				gfx_buffer[g_col][g_y] = 1
+            area[:] = 1
         elif state == GFX_OFF:
-            for g_y in range(MATRIX_HEIGHT*8):
-				gfx_buffer[g_col][g_y] = 0
+            area[:] = 0
         elif state == GFX_INVERT:
-            for g_y in range(MATRIX_HEIGHT*8):
-				gfx_buffer[g_col][g_y] = gfx_buffer[g_col][g_y] ^ 1
-				
-def gfx_line(start_x, start_y, end_x, end_y, state=GFX_INVERT, incl_endpoint=GFX_ON):
-    # Draw a straight line in the graphics buffer between the specified start- & end-points
-    # The line can be drawn by setting each affected pixel to either on, off, or the inverse of its previous state
-    # The final point of the line (end_x, end_y) can either be included (default) or omitted
-    # It can be usefully omitted if drawing another line starting from this previous endpoint using GFX_INVERT
-    start_x, end_x = int(start_x), int(end_x)
-    start_y, end_y = int(start_y), int(end_y)
-    len_x = end_x - start_x
-    len_y = end_y - start_y
-    if abs(len_x) + abs(len_y) == 0:
-        if incl_endpoint == GFX_ON:
-            gfx_set_px(start_x, start_y, state)
-    elif abs(len_x) > abs(len_y):
-        step_x = abs(len_x) / len_x
-        for g_x in range(start_x, end_x + incl_endpoint*step_x, step_x):
-            g_y = int(start_y + float(len_y) * (float(g_x - start_x)) / float(len_x) + 0.5)
-            if (g_x in gfx_columns) and (g_y in gfx_rows):
-            #if (0 <= g_x < 8*NUM_MATRICES) and (0<= g_y <8):
-                gfx_set_px(g_x, g_y, state)
+            area ^= 1
+
+    def get_column_bits(self, g_x):
+        bits = 0
+        for g_y in numpy.flatnonzero(self.pixels[g_x]):
+            bits |= 1 << int(g_y)
+        return bits
+
+    def put_column_bits(self, g_x, bits, masks=None):
+        if masks is None:
+            self.pixels[g_x] = [(bits >> g_y) & 0x01 for g_y in self.rows]
+            return
+        column = self.pixels[g_x]
+        for band, mask in masks:
+            for l_row in range(8):
+                if mask & (0x80 >> l_row):
+                    column[band*8 + l_row] = (bits >> (band*8 + l_row)) & 0x01
+
+    def scroll_packed(self, direction, start_x, extent_x, start_y, extent_y, distance, columns_in=None, rows_in=None):
+        area = self.pixels[start_x:start_x + extent_x, start_y:start_y + extent_y]
+        distance_x = min(distance, extent_x)
+        distance_y = min(distance, extent_y)
+        if distance_x and direction & (DIR_L | DIR_R):
+            incoming = bits_array(columns_in, distance_x, extent_y)
+            if direction & DIR_L:
+                area[:extent_x - distance_x] = area[distance_x:].copy()
+                area[extent_x - distance_x:] = incoming
+            else:
+                area[distance_x:] = area[:extent_x - distance_x].copy()
+                area[:distance_x] = incoming
+        if distance_y and direction & (DIR_U | DIR_D):
+            incoming = bits_array(rows_in, extent_x, distance_y)
+            if direction & DIR_U:
+                area[:, distance_y:] = area[:, :extent_y - distance_y].copy()
+                area[:, :distance_y] = incoming
+            else:
+                area[:, :extent_y - distance_y] = area[:, distance_y:].copy()
+                area[:, extent_y - distance_y:] = incoming
+
+    def to_lists(self):
+        return self.pixels.tolist()
+
+    def copy_from(self, other):
+        numpy.copyto(self.pixels, other.pixels)
+
+    def column_data(self, col):
+        return self.frame()[col]
+
+    def frame(self):
+        packed = numpy.packbits(self.pixels, axis=1)
+        self.frame_data[:, 1::2] = packed.ravel()[self.wire_index]
+        return self.frame_data.tolist()
+
+def graphic_edge(graphic, l_cols, first_row, num_rows):
+    # Return the pixels first_row to first_row+num_rows-1 of the columns l_cols of a graphic (GFX_ON, GFX_OFF or a
+    # 2d array[x][y], missing pixels being off) as a list of integers, bit 0 = first_row
+    if graphic == GFX_ON:
+        return [(1 << num_rows) - 1] * len(l_cols)
+    if not isinstance(graphic, list):
+        return [0] * len(l_cols)
+    edge = []
+    for l_col in l_cols:
+        bits = 0
+        column = graphic[l_col] if l_col < len(graphic) and isinstance(graphic[l_col], list) else []
+        for l_row, px in enumerate(column[first_row:first_row + num_rows]):
+            if px:
+                bits |= 1 << l_row
+        edge.append(bits)
+    return edge
+
+def shift_bits(bits, distance):
+    # Shift packed pixels up by distance (down if negative)
+    return bits << distance if distance >= 0 else bits >> -distance
+
+def bits_array(columns, num_columns, num_rows):
+    # Return a list of integers (see graphic_edge(); None for all off) as a num_columns x num_rows NumPy array
+    if not columns:
+        return numpy.zeros((num_columns, num_rows), dtype=numpy.uint8)
+    return numpy.array([[(bits >> l_row) & 0x01 for l_row in range(num_rows)] for bits in columns],
+                       dtype=numpy.uint8).reshape(num_columns, num_rows)
+
+def new_gfx_buffer(width, height, use_numpy=GFX_NUMPY):
+    # Create a graphics buffer for an array of width x height matrices, using NumPy if requested and available
+    if use_numpy and numpy is not None:
+        return NumpyGfxBuffer(width, height)
+    return GfxBuffer(width, height)
+
+def module_pixel(rotation, x, y):
+    # Return the (column, row) of its own LEDs at which a module mounted rotated clockwise by rotation degrees shows
+    # the pixel x, y of its cell (0-7, x from the left, y from the bottom)
+    if rotation == 90:
+        return 7 - y, x
+    elif rotation == 180:
+        return 7 - x, 7 - y
+    elif rotation == 270:
+        return y, 7 - x
+    return x, y
+
+# Lookup tables for rotated modules: ROTATE_TABLES[rotation][col][byte] spreads the byte for column col of a cell
+# over the 8 column bytes of the module, packed into an integer (module column c in bits 8*c to 8*c+7)
+ROTATE_TABLES = {}
+
+def rotate_table(rotation):
+    if rotation not in ROTATE_TABLES:
+        table = []
+        for x in range(8):
+            spread = [0] * 256
+            for value in range(256):
+                for y in range(8):
+                    if value & (0x80 >> y):
+                        col, row = module_pixel(rotation, x, y)
+                        spread[value] |= 0x80 >> row << 8*col
+            table.append(spread)
+        ROTATE_TABLES[rotation] = table
+    return ROTATE_TABLES[rotation]
+
+class Topology(object):
+    # The wiring of an array of width x height matrices: the position of each matrix along the chain (0 = nearest
+    # the Pi), and the rotation of each module
+    # The library functions number the matrices as described at the top of this script, and build each frame
+    # (see play()) as if that were the order along the chain; send_frame() converts it with chain_frame()
+    # order: COLUMN_MAJOR, ROW_MAJOR or SERPENTINE (see MATRIX_ORDER)
+    # rotation: 0, 90, 180 or 270 degrees clockwise for all of the modules, or a list of them, one per matrix
+    # Tables built on creation:
+    # - chain_positions[matrix] : position along the chain of each matrix; matrix_at[position] the reverse
+    # - cell_positions[l_col][l_row] : position along the chain of the matrix in column l_col, row l_row (from the
+    #   bottom) of the array
+    # - position_index : the index in a transfer of the bytes to send in their place along the chain; word_index
+    #   is the same, or None if any module is rotated (the column registers can then not be mapped word by word)
+    def __init__(self, width, height, order=COLUMN_MAJOR, rotation=0):
+        self.width = width
+        self.height = height
+        self.num_matrices = width * height
+        self.order = order
+        if isinstance(rotation, int):
+            rotation = [rotation] * self.num_matrices
+        self.rotations = [angle % 360 for angle in rotation]
+        if order not in (COLUMN_MAJOR, ROW_MAJOR, SERPENTINE) or len(self.rotations) != self.num_matrices or \
+                any(angle not in (0, 90, 180, 270) for angle in self.rotations):
+            raise ValueError("invalid topology: order %r, rotation %r" % (order, rotation))
+        self.cell_positions = [[None] * height for l_col in range(width)]
+        for l_col in range(width):
+            for l_row in range(height):
+                if order == COLUMN_MAJOR:
+                    position = l_col*height + l_row
+                elif order == ROW_MAJOR:
+                    position = l_row*width + l_col
+                else:
+                    position = l_row*width + (l_col if l_row % 2 == 0 else width - 1 - l_col)
+                self.cell_positions[l_col][l_row] = position
+        self.chain_positions = [self.cell_positions[matrix // height][matrix % height]
+                                for matrix in range(self.num_matrices)]
+        self.matrix_at = [None] * self.num_matrices
+        for matrix, position in enumerate(self.chain_positions):
+            self.matrix_at[position] = matrix
+        self.rotated = any(self.rotations)
+        self.identity = not self.rotated and self.chain_positions == list(range(self.num_matrices))
+        # the words of a transfer are for the furthest matrix (or position) first
+        self.position_index = []
+        for position in reversed(range(self.num_matrices)):
+            offset = 2 * (self.num_matrices - 1 - self.matrix_at[position])
+            self.position_index += [offset, offset + 1]
+        self.word_index = None if self.rotated else self.position_index
+        self.rotate_tables = [rotate_table(angle) if angle else None for angle in self.rotations]
+        # Plan for the full frames of rotated modules (8 full-length transfers writing the column registers 1-8 in
+        # order, as GfxBuffer.frame() and most library frames do), see chain_frame():
+        # - frame_registers[col] : the register bytes of such a transfer, ie col+1 for every matrix
+        # - data_index : for each word along the chain (furthest first), the word of the matrix there in the frame
+        # - rotation_plan : (word along the chain, word in the frame, rotate table) of each rotated module
+        self.frame_registers = [[col + 1] * self.num_matrices for col in range(8)]
+        self.data_index = [index // 2 for index in self.position_index[0::2]]
+        self.rotation_plan = [(word, self.data_index[word], self.rotate_tables[self.matrix_at[position]])
+                              for word, position in enumerate(reversed(range(self.num_matrices)))
+                              if self.rotate_tables[self.matrix_at[position]] is not None]
+
+    def chain_frame(self, frame):
+        # Convert a frame addressed to the matrices by their numbers into the frame to send along the chain
+        # Transfers which are not the full length of the chain are sent unchanged
+        # The 8 column bytes of a rotated module are combined into all 8 of its column registers, so a frame should
+        # write all 8 columns of such a module (as all the frames of the library do), any others being taken as 0
+        if self.identity:
+            return frame
+        length = 2 * self.num_matrices
+        if self.word_index is not None:
+            word_index = self.word_index
+            return [[column_data[i] for i in word_index] if len(column_data) == length else column_data
+                    for column_data in frame]
+        if len(frame) == 8 and all(len(column_data) == length and column_data[0::2] == registers
+                                   for column_data, registers in zip(frame, self.frame_registers)):
+            # a full frame: the bytes of each module are moved and rotated by the plan built on creation
+            data = [column_data[1::2] for column_data in frame]
+            chain_data = [[col_data[i] & 0xFF for i in self.data_index] for col_data in data]
+            for word, frame_word, table in self.rotation_plan:
+                bits = 0
+                for col in range(8):
+                    bits |= table[col][data[col][frame_word] & 0xFF]
+                for col in range(8):
+                    chain_data[col][word] = (bits >> 8*col) & 0xFF
+            chain_frame = []
+            for col in range(8):
+                column_data = [col + 1, 0] * self.num_matrices
+                column_data[1::2] = chain_data[col]
+                chain_frame.append(column_data)
+            return chain_frame
+        # the column bytes written for each matrix (None: not written), and the transfers passed on unchanged
+        cols = [None] * self.num_matrices
+        chain_frame = []
+        for column_data in frame:
+            if len(column_data) != length:
+                chain_frame.append(column_data)
+                continue
+            other_words = False
+            for i in range(0, length, 2):
+                register = column_data[i] & 0x0F
+                if 1 <= register <= 8:
+                    matrix = self.num_matrices - 1 - i // 2
+                    if cols[matrix] is None:
+                        cols[matrix] = [None] * 8
+                    cols[matrix][register - 1] = column_data[i+1] & 0xFF
+                elif register != MAX7219_REG_NOOP:
+                    other_words = True
+            if other_words:
+                # registers other than the columns are passed on to the same matrices, without rotation
+                control_data = list(column_data)
+                for i in range(0, length, 2):
+                    if 1 <= control_data[i] & 0x0F <= 8:
+                        control_data[i:i+2] = NO_OP
+                chain_frame.append([control_data[i] for i in self.position_index])
+        # the column bytes to send to each position along the chain
+        module_cols = [None] * self.num_matrices
+        for matrix, matrix_cols in enumerate(cols):
+            if matrix_cols is None:
+                continue
+            table = self.rotate_tables[matrix]
+            if table is None:
+                module_cols[self.chain_positions[matrix]] = matrix_cols
+                continue
+            bits = 0
+            for col in range(8):
+                bits |= table[col][matrix_cols[col] or 0]
+            module_cols[self.chain_positions[matrix]] = [(bits >> 8*col) & 0xFF for col in range(8)]
+        for col in range(8):
+            column_data = NO_OP * self.num_matrices
+            for position, position_cols in enumerate(module_cols):
+                if position_cols is not None and position_cols[col] is not None:
+                    offset = 2 * (self.num_matrices - 1 - position)
+                    column_data[offset:offset+2] = [col + 1, position_cols[col]]
+            chain_frame.append(column_data)
+        return chain_frame
+
+class CompiledFont(object):
+    # A font prepared for drawing by table lookups rather than bit manipulation - use compile_font() to get one
+    # For each character code:
+    # - cols[code]     : the 8 column bytes of the character, as in the font (col_bytes[code]: the same as a bytes string)
+    # - head[n][code]  : the first n columns, tail[n][code]: the columns after the first n (n=0-8)
+    #                    eg tail[stage][curr] + head[stage][next] is curr scrolled left by stage columns
+    # - shr[n][code]   : the column bytes shifted right by n bits, ie the character moved up by n rows (n=0-8)
+    # - shl[n][code]   : the column bytes shifted left by n bits (moved down), cut to 8 bits
+    #                    eg shr[stage][curr] | shl[8-stage][next] is curr scrolled up by stage rows
+    # - rev_cols[code] : the column bytes with the bits reversed (LSB = bottom row), as used by GfxBuffer.blit_col()
+    # - rows[code]     : row-major bitmap: 8 bytes from the bottom row up, MSB = left-hand column
+    def __init__(self, font):
+        self.cols = [tuple(glyph[:8]) for glyph in font]
+        self.col_bytes = [bytes(bytearray(cols)) for cols in self.cols]
+        self.head = [[cols[:n] for cols in self.cols] for n in range(9)]
+        self.tail = [[cols[n:] for cols in self.cols] for n in range(9)]
+        self.shr = [[tuple(col >> n for col in cols) for cols in self.cols] for n in range(9)]
+        self.shl = [[tuple((col << n) & 0xFF for col in cols) for cols in self.cols] for n in range(9)]
+        self.rev_cols = [tuple(BIT_REVERSE[col] for col in cols) for cols in self.cols]
+        self.rows = [tuple(sum(((cols[l_col] >> (7 - l_row)) & 0x01) << (7 - l_col) for l_col in range(8))
+                           for l_row in range(8)) for cols in self.cols]
+
+# Fonts compiled so far, by id(font): (font, CompiledFont)
+compiled_fonts = {}
+
+def compile_font(font):
+    # Return the CompiledFont for the specified font (any list of 8-byte characters), compiling it on first use
+    # A font is expected not to change once it has been used; if it does, clear compiled_fonts
+    entry = compiled_fonts.get(id(font))
+    if entry is None or entry[0] is not font:
+        entry = compiled_fonts[id(font)] = (font, CompiledFont(font))
+    return entry[1]
+
+class Sprite(object):
+    # A sprite compiled once for drawing with gfx_sprite(): the column bytes and mask bytes of the sprite at each of
+    # the 8 vertical offsets within a byte, so that drawing costs a few operations per byte rather than per pixel
+    # pixels: 2d array[x][y] of pixels, as for gfx_sprite_array(); columns may be of different lengths
+    # mask: optional 2d array of the same shape, marking the pixels which belong to the sprite (by default all of
+    #       them): GFX_ON copies those pixels, leaving the rest of the buffer showing through
+    # - width, height : the size of the sprite in pixels
+    # - bits[l_col], mask_bits[l_col] : the pixels and mask of each column as integers, bit 0 = bottom pixel
+    def __init__(self, pixels, mask=None):
+        self.width = len(pixels)
+        self.height = max([len(l_col) for l_col in pixels] or [0])
+        self.bits = []
+        self.mask_bits = []
+        for l_col in range(self.width):
+            column = pixels[l_col]
+            column_mask = mask[l_col] if mask is not None else [1] * len(column)
+            bits = mask_bits = 0
+            for l_row in range(len(column)):
+                if column_mask[l_row]:
+                    mask_bits |= 1 << l_row
+                    if column[l_row]:
+                        bits |= 1 << l_row
+            self.bits.append(bits)
+            self.mask_bits.append(mask_bits)
+        # shifted[shift]: for each column, the (bytes, mask bytes) of the bands of the buffer it covers when drawn
+        # shift rows above a band boundary, in the buffer's format (see columns()); NumPy arrays (see arrays())
+        self.shifted = [None] * 8
+        self.numpy_arrays = None
+
+    def columns(self, shift):
+        # Return the (bytes, mask bytes) of each column drawn shift (0-7) rows above the bottom of a band
+        if self.shifted[shift] is None:
+            num_bands = (self.height + shift + 7) // 8
+            self.shifted[shift] = [
+                (bytearray(BIT_REVERSE[(bits << shift >> 8*band) & 0xFF] for band in range(num_bands)),
+                 bytearray(BIT_REVERSE[(mask_bits << shift >> 8*band) & 0xFF] for band in range(num_bands)))
+                for bits, mask_bits in zip(self.bits, self.mask_bits)]
+        return self.shifted[shift]
+
+    def arrays(self):
+        # Return the pixels and mask as 2d NumPy arrays of booleans, for NumpyGfxBuffer
+        if self.numpy_arrays is None:
+            shape = (self.width, self.height)
+            self.numpy_arrays = tuple(
+                numpy.array([[(bits >> l_row) & 0x01 for l_row in range(self.height)] for bits in column_bits],
+                            dtype=bool).reshape(shape)
+                for column_bits in (self.bits, self.mask_bits))
+        return self.numpy_arrays
+
+# Monotonic clock used to schedule animation frames (time.time() on Python versions without time.monotonic())
+clock = getattr(time, 'monotonic', time.time)
+
+class FrameScheduler(object):
+    # Paces the frames of an animation against absolute deadlines (period seconds apart) on a monotonic clock
+    # The time spent packing and sending a frame is taken off the wait, so the frame rate does not drift with the
+    # size of the array. A frame finishing after its deadline is an overrun: the schedule restarts from that frame
+    # rather than rushing the following ones; overruns counts them and lateness sums up how late they were
+    # All the animation functions accept a FrameScheduler as their speed argument, and return the one they used
+    def __init__(self, period):
+        self.period = float(period)
+        # set by pps(): the period then follows the pixels moved by each frame, see set_pixels_per_frame()
+        self.pixels_per_second = None
+        self.deadline = None
+        self.frames = 0
+        self.overruns = 0
+        self.lateness = 0.0
+
+    @classmethod
+    def fps(cls, frames_per_second):
+        # Scheduler for a number of frames per second
+        return cls(1.0 / frames_per_second)
+
+    @classmethod
+    def pps(cls, pixels_per_second):
+        # Scheduler for a number of pixels per second: each animation sets how many pixels its frames move the
+        # content by (see set_pixels_per_frame()), from which the period follows
+        scheduler = cls(1.0 / pixels_per_second)
+        scheduler.pixels_per_second = float(pixels_per_second)
+        return scheduler
+
+    def set_pixels_per_frame(self, pixels):
+        # Set by each animation to the number of pixels its frames move the content by; unless the scheduler was
+        # created by pps(), the period is left as it is
+        if self.pixels_per_second:
+            self.period = pixels / self.pixels_per_second
+
+    def start(self):
+        # Start the schedule: the first frame is due one period from now
+        self.deadline = clock()
+
+    def delay(self):
+        # Move on to the deadline of the next frame and return the seconds left until then (0 after an overrun)
+        # For callers doing the waiting themselves, eg await asyncio.sleep(scheduler.delay())
+        now = clock()
+        if self.deadline is None:
+            self.deadline = now
+        self.deadline += self.period
+        self.frames += 1
+        if now > self.deadline:
+            # a zero period has no deadlines to miss (eg to run as fast as possible), so is never an overrun
+            if self.period > 0:
+                self.overruns += 1
+                self.lateness += now - self.deadline
+            self.deadline = now
+            return 0
+        return self.deadline - now
+
+    def wait(self):
+        # Wait until the deadline of the current frame
+        seconds = self.delay()
+        if seconds > 0:
+            time.sleep(seconds)
+
+def frame_scheduler(speed, pixels_per_frame=1):
+    # Return a FrameScheduler for the speed argument of an animation function: either a FrameScheduler, or
+    # a number 0-9 for practical purposes (not necessarily integral), where each frame takes 0.5**speed seconds
+    # pixels_per_frame: the number of pixels each frame of the animation moves the content by, which sets the
+    # period of a FrameScheduler.pps()
+    if isinstance(speed, FrameScheduler):
+        speed.set_pixels_per_frame(pixels_per_frame)
+        return speed
+    return FrameScheduler(0.5 ** speed)
+
+class Stats(object):
+    # Performance counters of one library function (or of all of them, see Display.stats()):
+    # - calls, frames            : the number of calls, and of frames sent (see send_frame())
+    # - transfers, bytes_sent    : the number of SPI transfers and bytes sent
+    # - overruns                 : the number of frames which missed their deadline (see FrameScheduler)
+    # - pack_time, transfer_time, sleep_time : seconds spent preparing the data (all the time spent in the function
+    #   except for the other two), in the transport, and waiting for frame deadlines
+    FIELDS = ('calls', 'frames', 'transfers', 'bytes_sent', 'overruns', 'pack_time', 'transfer_time', 'sleep_time')
+
+    def __init__(self):
+        self.calls = self.frames = self.transfers = self.bytes_sent = self.overruns = 0
+        self.pack_time = self.transfer_time = self.sleep_time = 0.0
+
+    def add(self, other):
+        for field in Stats.FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def as_dict(self):
+        return dict((field, getattr(self, field)) for field in Stats.FIELDS)
+
+def counted(function):
+    # Decorator for the Display methods whose calls are counted separately in Display.stats(), under their name
+    return functools.wraps(function)(lambda self, *args, **kwargs:
+                                     self.counted_call(function.__name__, function, self, *args, **kwargs))
+
+class RenderThread(threading.Thread):
+    # Background thread sending a graphics buffer to the array, so that drawing the next frame (into the 'back'
+    # buffer) overlaps with the transfer of the previous one
+    # present() copies the back buffer into the thread's own 'front' buffer and returns at once; the thread packs
+    # and sends the front buffer whenever a new one has been presented. If frames are presented faster than they
+    # can be sent, the intermediate ones are skipped, so the array always catches up with the latest frame
+    # display: the Display whose graphics buffer is presented
+    def __init__(self, display):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.display = display
+        self.front = display.gfx_buffer.copy()
+        self.condition = threading.Condition()
+        self.pending = False
+        self.busy = False
+        self.running = True
+        self.error = None
+        # the number of frames sent so far
+        self.frames = 0
+
+    def present(self, back_buffer):
+        # Hand over a new frame without waiting for it to be sent
+        # An exception raised by a previous transfer in the thread is raised here
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        with self.condition:
+            self.front.copy_from(back_buffer)
+            self.pending = True
+            self.condition.notify_all()
+
+    def flush(self):
+        # Wait until the last presented frame has been sent
+        # An exception raised by a transfer in the thread is raised here
+        with self.condition:
+            while (self.pending or self.busy) and self.is_alive():
+                self.condition.wait(0.1)
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def stop(self):
+        # Send the last presented frame, then end the thread
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.join()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                self.busy = True
+            try:
+                self.display.counted_call('render_thread', self.send_front)
+            except Exception as error:
+                self.error = error
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+
+    def send_front(self):
+        # Pack the front buffer (holding the condition, so that present() does not change it meanwhile) and send it
+        with self.condition:
+            self.pending = False
+            frame, info = self.display.pack_frame(self.front.frame, self.frames)
+            self.frames += 1
+        self.display.send_packed_frame(frame, info)
+
+def shifted_letter(compiled_font, curr_code, next_code, progress, direction):
+    # Return the 8 column bytes of curr_code partially (progress=0-8) scrolled towards next_code, or None if
+    # direction is not one of DIR_L, DIR_R, DIR_U, DIR_D
+    if direction == DIR_L:
+        return compiled_font.tail[progress][curr_code] + compiled_font.head[progress][next_code]
+    elif direction == DIR_R:
+        return compiled_font.tail[8-progress][next_code] + compiled_font.head[8-progress][curr_code]
+    elif direction == DIR_U:
+        curr_char, next_char = compiled_font.shr[progress][curr_code], compiled_font.shl[8-progress][next_code]
+        return tuple(curr_char[col] | next_char[col] for col in range(8))
+    elif direction == DIR_D:
+        curr_char, next_char = compiled_font.shl[progress][curr_code], compiled_font.shr[8-progress][next_code]
+        return tuple(curr_char[col] | next_char[col] for col in range(8))
+
+def line_steps(start, length, minor_start, minor_length, limit, minor_limit, incl_endpoint):
+    # Generate the (major, minor) coordinates of the points of a line along its major axis (abs(length) >
+    # abs(minor_length)), with 0 <= major < limit and 0 <= minor < minor_limit, in integers only (Bresenham)
+    # The minor coordinate is minor_start + minor_length*steps/abs(length), rounded to the nearest (halves up)
+    steps = abs(length)
+    step = 1 if length > 0 else -1
+    last = steps if incl_endpoint else steps - 1
+    # clip the steps to the major axis
+    if step > 0:
+        first, last = max(0, -start), min(last, limit - 1 - start)
     else:
-        step_y = abs(len_y) / len_y
-        for g_y in range(start_y, end_y + incl_endpoint*step_y, step_y):
-            g_x = int(start_x + float(len_x) * (float(g_y - start_y)) / float(len_y) + 0.5)
-            if (g_x in gfx_columns) and (g_y in gfx_rows):
-            #if (0 <= g_x < 8*NUM_MATRICES) and (0<= g_y <8):
-                gfx_set_px(g_x, g_y, state)
-
-def gfx_letter(char_code, start_x=0, start_y=0, state=GFX_INVERT, font=DEFAULT_FONT):
-    # Overlay one character from the specified font into the graphics buffer, at a specified x-y position
-    # The character is drawn by setting each affected pixel to either on, off, or the inverse of its previous state
-	start_x = int(start_x)
-	start_y = int(start_y)
-	for l_row in range(0, 8):
-		for l_col in range(0, 8):
-			if (l_col + start_x) in gfx_columns and (l_row + start_y) in gfx_rows:
-				if state == GFX_ON:
-					gfx_buffer[l_col + start_x][l_row + start_y] = ((font[char_code][l_col] & pow(2, 7-l_row))>>(7-l_row))
-				elif state == GFX_OFF:
-					gfx_buffer[l_col + start_x][l_row + start_y] = ~((font[char_code][l_col] & pow(2, 7-l_row))>>(7-l_row))
-				elif state == GFX_INVERT:
-					gfx_buffer[l_col + start_x][l_row + start_y] = ((font[char_code][l_col] & pow(2, 7-l_row))>>(7-l_row)) ^ gfx_buffer[l_col + start_x][l_row + start_y]
-
-def gfx_sprite_array(sprite, start_x=0, start_y=0, state=GFX_INVERT):
-    # Overlay a specified 2d array[x][y] into the graphics buffer, at a specified position
-    # The sprite is drawn by setting each affected pixel to either on, off, or the inverse of its previous state
-    # Sprite is an m-pixel (wide) x n-pixel hide array, eg [[0,0,1,0],[1,1,1,1],[0,0,1,0]] for a cross
-	start_x = int(start_x)
-	start_y = int(start_y)
-	for l_col in range(len(sprite)):
-		for l_row in range(len(sprite[l_col])):
-			if (l_col + start_x) < len(gfx_buffer) and (l_row + start_y) < len(gfx_buffer[l_col + start_x]):
-				if state == GFX_ON:
-					gfx_buffer[l_col + start_x][l_row + start_y] = sprite[l_col][l_row]
-				elif state == GFX_OFF:
-					gfx_buffer[l_col + start_x][l_row + start_y] = ~sprite[l_col][l_row]
-				elif state == GFX_INVERT:
-					gfx_buffer[l_col + start_x][l_row + start_y] = sprite[l_col][l_row] ^ gfx_buffer[l_col + start_x][l_row + start_y]
-
-def gfx_scroll_towards(new_graphic=GFX_OFF, repeats=0, speed=3, direction=DIR_L, finish=True):
-	# Scrolls another graphic (2d array, same width and height like gfx_buffer: (8*MATRIX_WIDTH) x (8*MATRIX_HEIGHT) )
-	# to the chosen direction.
-	# repeats=0 gives indefinite scrolling until script is interrupted
-    # speed: 0-9 for practical purposes; speed does not have to integral
-    # direction: DIR_L, DIR_R, DIR_U, DIR_D    
-	delay = 0.5 ** speed
-	if repeats <= 0:
-		indef = True
-	else:
-		indef = False
-		repeats = int(repeats)
-	#errorhandling
-	if new_graphic == GFX_OFF:
-		new_graphic = [([0] * 8*MATRIX_HEIGHT)] * MATRIX_WIDTH*8
-	elif new_graphic == GFX_ON:
-		new_graphic = [([1] * 8*MATRIX_HEIGHT)] * MATRIX_WIDTH*8
-	else:
-		if ( not ( isinstance(new_graphic, list) ) ):
-			new_graphic = []			
-		for (i, item) in enumerate(new_graphic):
-			if (not isinstance(item, list)):
-				item = []
-			new_graphic[i] = (item + ([0]*8*MATRIX_HEIGHT))[:8*MATRIX_HEIGHT]
-		new_graphic = (new_graphic + ([ [0] * 8*MATRIX_HEIGHT ] * MATRIX_WIDTH*8) )[:MATRIX_WIDTH*8]
-	old_graphic = gfx_read_buffer()
-	#loop
-	while indef or repeats > 0:
-		repeats -= 1
-		if direction & DIR_L:
-			for l_col in range(8*MATRIX_WIDTH):
-				graphic = [new_graphic[l_col]]	#only column
-				gfx_scroll(DIR_L, graphic, 0, 8*MATRIX_WIDTH, 0, 8*MATRIX_HEIGHT, 1)
-				gfx_render()
-				time.sleep(delay)
-		elif direction & DIR_R:
-			for l_col in reversed(range(8*MATRIX_WIDTH)):
-				graphic = [ [0] * MATRIX_HEIGHT*8 ]*(len(new_graphic)-1) + [new_graphic[l_col]]
-				gfx_scroll(DIR_R, graphic, 0, 8*MATRIX_WIDTH, 0, 8*MATRIX_HEIGHT, 1)
-				gfx_render()
-				time.sleep(delay)
-		elif direction & DIR_U:
-			for l_row in reversed(range(8*MATRIX_HEIGHT)):
-				graphic = []
-				for col in range(len(new_graphic)):
-					graphic	+= [[0]*(MATRIX_HEIGHT*8 -1) + [new_graphic[col][l_row]]]
-				gfx_scroll(DIR_U, graphic, 0, 8*MATRIX_WIDTH, 0, 8*MATRIX_HEIGHT, 1)
-				gfx_render()
-				time.sleep(delay)
-		elif direction & DIR_D:
-			for l_row in range(8*MATRIX_HEIGHT):
-				graphic = []
-				for col in range(len(new_graphic)):
-					graphic	+=  [[new_graphic[col][l_row]] + [0]*(MATRIX_HEIGHT*8 -1)]
-				gfx_scroll(DIR_D, graphic, 0, 8*MATRIX_WIDTH, 0, 8*MATRIX_HEIGHT, 1)
-				gfx_render()
-				time.sleep(delay)
-		"""elif direction & DIR_LU:
-		
-		elif direction & DIR_RU:
-		
-		elif direction & DIR_LD:
-		
-		elif direction & DIR_RD:"""
-		new_graphic, old_graphic = old_graphic, new_graphic
-
-def gfx_scroll(direction=DIR_L, new_graphic=GFX_OFF, start_x=0, extent_x=MATRIX_WIDTH*8, start_y=0, extent_y=MATRIX_HEIGHT*8, distance=1):
-    # Scroll the specified area of the graphics buffer by (distance) pixel in the given direction
-    # direction: any of DIR_U, DIR_D, DIR_L, DIR_R
-    # Pixels outside the rectangle are unaffected; pixels scrolled outside the rectangle are discarded
-    # The 'new' pixels in the gap created are either set to on or off or in the new graphic
-	distance = abs(int(distance))
-	if (direction == DIR_L or direction == DIR_R) and distance > extent_x:
-		distance = extent_x
-	if (direction == DIR_U or direction == DIR_D) and distance > extent_y:
-		distance = extent_y
-	start_x  = max(0, min(8*MATRIX_WIDTH - 1 , int(start_x)))
-	extent_x = max(0, min(8*MATRIX_WIDTH - start_x, int(extent_x)))
-	start_y  = max(0, min(8*MATRIX_HEIGHT - 1, int(start_y)))
-	extent_y = max(0, min(8*MATRIX_HEIGHT - start_y, int(extent_y)))
-	if new_graphic == GFX_OFF:
-		new_graphic = [([0] * extent_y)] * extent_x
-	elif new_graphic == GFX_ON:
-		new_graphic = [([1] * extent_y)] * extent_x
-	else:
-		if ( not ( isinstance(new_graphic, list) ) ):
-			new_graphic = []			
-		for (i, item) in enumerate(new_graphic):
-			if (not isinstance(item, list)):
-				item = []
-			new_graphic[i] = (item + ([0]*extent_y))[:extent_y]
-		new_graphic = (new_graphic + ([ [0] * extent_y ] * extent_x) )[:extent_x]
-	if direction & DIR_L:
-		for g_x in range(start_x, start_x + extent_x):
-			for g_y in range(start_y, start_y + extent_y):
-				if g_x + distance < start_x + extent_x :
-					gfx_buffer[g_x][g_y] = gfx_buffer[g_x+distance][g_y]
-				else:
-					gfx_buffer[g_x][g_y] = new_graphic[g_x - start_x - extent_x + distance][g_y - start_y]
-	elif direction & DIR_R:
-		for g_x in reversed(range(start_x, start_x + extent_x)):
-			for g_y in range(start_y, start_y + extent_y):
-				if g_x - distance < start_x:
-					gfx_buffer[g_x][g_y] = new_graphic[g_x - start_x + extent_x - distance][g_y - start_y]
-				else:
-					gfx_buffer[g_x][g_y] = gfx_buffer[g_x-distance][g_y]
-	if direction & DIR_U:
-		for g_x in range(start_x, start_x + extent_x):
-			for g_y in reversed(range(start_y, start_y + extent_y)):
-				if g_y - distance < start_y :
-					gfx_buffer[g_x][g_y] = new_graphic[g_x - start_x][g_y - start_y + extent_y - distance]
-				else:
-					gfx_buffer[g_x][g_y] = gfx_buffer[g_x][g_y-distance]
-	elif direction & DIR_D:
-		for g_x in range(start_x, start_x + extent_x):
-			for g_y in range(start_y, start_y + extent_y):
-				if g_y + distance < start_y + extent_y:
-					gfx_buffer[g_x][g_y] = gfx_buffer[g_x][g_y+distance]
-				else:
-					gfx_buffer[g_x][g_y] = new_graphic[g_x - start_x][g_y - start_y - extent_y + distance]
-
-def gfx_effect_wipe(new_graphic, speed=3, transition=DIR_R):
-	# Transition from displayed graphic to another graphic by a 'wipe'
-	# speed: 0-9 for practical purposes; speed does not have to integral
-	# transition: DIR_U, DIR_D, DIR_L, DIR_R, DIR_RU, DIR_RD, DIR_LU, DIR_LD
-	delay = 0.5 ** speed
-	#errorhandling
-	if new_graphic == GFX_OFF:
-		new_graphic = [([0] * 8*MATRIX_HEIGHT)] * MATRIX_WIDTH*8
-	elif new_graphic == GFX_ON:
-		new_graphic = [([1] * 8*MATRIX_HEIGHT)] * MATRIX_WIDTH*8
-	else:
-		if ( not ( isinstance(new_graphic, list) ) ):
-			new_graphic = []			
-		for (i, item) in enumerate(new_graphic):
-			if (not isinstance(item, list)):
-				item = []
-			new_graphic[i] = (item + ([0]*8*MATRIX_HEIGHT))[:8*MATRIX_HEIGHT]
-		new_graphic = (new_graphic + ([ [0] * 8*MATRIX_HEIGHT ] * MATRIX_WIDTH*8) )[:MATRIX_WIDTH*8]
-		
-	maximum = max(MATRIX_HEIGHT*8, MATRIX_WIDTH*8)
-	if transition == DIR_L:
-		for g_col in reversed(range(MATRIX_WIDTH*8)):
-			for g_row in range(MATRIX_HEIGHT*8):
-				gfx_buffer[g_col][g_row] = new_graphic[g_col][g_row]
-			gfx_render()
-			time.sleep(delay)
-	elif transition == DIR_R:
-		for g_col in range(MATRIX_WIDTH*8):
-			for g_row in range(MATRIX_HEIGHT*8):
-				gfx_buffer[g_col][g_row] = new_graphic[g_col][g_row]
-			gfx_render()
-			time.sleep(delay)
-	elif transition == DIR_D:
-		for g_row in reversed(range(MATRIX_HEIGHT*8)):
-			for g_col in range(MATRIX_WIDTH*8):
-				gfx_buffer[g_col][g_row] = new_graphic[g_col][g_row]
-			gfx_render()
-			time.sleep(delay)
-	elif transition == DIR_U:
-		for g_row in range(MATRIX_HEIGHT*8):
-			for g_col in range(MATRIX_WIDTH*8):
-				gfx_buffer[g_col][g_row] = new_graphic[g_col][g_row]
-			gfx_render()
-			time.sleep(delay)
-	elif transition == DIR_RU:
-		for iter in range( MATRIX_HEIGHT*8 + MATRIX_WIDTH*8 - 1):
-			for stage in range(min(iter + 1,maximum)):
-				if iter - stage < MATRIX_WIDTH*8 and stage < MATRIX_HEIGHT*8:
-					gfx_buffer[iter - stage][stage] = new_graphic[iter - stage][stage]
-			gfx_render()
-			time.sleep(delay)
-	elif transition == DIR_LD:
-		for iter in reversed(range( MATRIX_HEIGHT*8 + MATRIX_WIDTH*8 - 1)):
-			for stage in range(min(iter + 1,maximum)):
-				if iter - stage < MATRIX_WIDTH*8 and stage < MATRIX_HEIGHT*8:
-					gfx_buffer[iter - stage][stage] = new_graphic[iter - stage][stage]
-			gfx_render()
-			time.sleep(delay)
-	elif transition == DIR_RD:
-		for iter in range( MATRIX_HEIGHT*8 + MATRIX_WIDTH*8 - 1):
-			for stage in range(min(iter + 1,maximum)):
-				if MATRIX_HEIGHT*8-1 - iter + stage >= 0 and stage < MATRIX_WIDTH*8:
-					gfx_buffer[stage][MATRIX_HEIGHT*8-1 - iter + stage] = new_graphic[stage][MATRIX_HEIGHT*8-1 - iter + stage]
-			gfx_render()
-			time.sleep(delay)
-	elif transition == DIR_LU:
-		for iter in reversed(range( MATRIX_HEIGHT*8 + MATRIX_WIDTH*8 - 1)):
-			for stage in range(min(iter + 1,maximum)):
-				if MATRIX_HEIGHT*8-1 - iter + stage >= 0 and stage < MATRIX_WIDTH*8:
-					gfx_buffer[stage][MATRIX_HEIGHT*8-1 - iter + stage] = new_graphic[stage][MATRIX_HEIGHT*8-1 - iter + stage]
-			gfx_render()
-			time.sleep(delay)
-	
-def gfx_effect_rain(new_graphic, speed=3):
-	# Sends pixels from top to its position (with random speed for every column)
-	# new_graphic has to be a 2d array with same width and height like gfx_buffer: 8*MATRIX_WIDTH x 8*MATRIX_HEIGHT
-	# speed: 0-9 for practical purposes; speed does not have to integral
-	delay = 0.5**speed
-	if ( not ( isinstance(new_graphic, list) ) ):
-		return
-	for (i, item) in enumerate(new_graphic):
-		if (not isinstance(item, list)):
-			item = []
-		new_graphic[i] = (item + ([0]*8*MATRIX_HEIGHT))[:8*MATRIX_HEIGHT]
-	new_graphic = (new_graphic + ([ [0] * 8*MATRIX_HEIGHT ] * MATRIX_WIDTH*8) )[:MATRIX_WIDTH*8]
-	tmp_buffer = [[None for x1 in xrange(MATRIX_HEIGHT*8)] for x2 in xrange(MATRIX_WIDTH*8)] 
-	speeds = [randrange(2,6) for c in range(MATRIX_WIDTH*8)]
-	for l_col in range(MATRIX_WIDTH*8):
-		tmp_buffer[l_col][MATRIX_HEIGHT*8-1] = new_graphic[l_col][0]
-	gfx_set_all(GFX_OFF)
-	for g_col in range(MATRIX_WIDTH*8):
-		for g_row in range(MATRIX_HEIGHT*8):
-			gfx_buffer[g_col][g_row] = 1 if tmp_buffer[g_col][g_row] == 1 else 0
-	gfx_render()
-	time.sleep(delay)
-	for iter in range(1,MATRIX_HEIGHT*8):
-		for l_col in range(MATRIX_WIDTH*8):
-			emptyCells = [idx for idx,i in enumerate(tmp_buffer[l_col]) if i==None]
-			if emptyCells != []:
-				firstEmptyCell = emptyCells[0]
-				for l_row in range(firstEmptyCell, MATRIX_HEIGHT*8):
-					nextNotNone = [idx for idx,i in enumerate(tmp_buffer[l_col]) if (i!=None and idx > l_row)]
-					if nextNotNone != []:
-						nxt = min(nextNotNone[0], l_row + speeds[l_col])
-						if nxt < MATRIX_HEIGHT*8:
-							tmp_buffer[l_col][l_row] = tmp_buffer[l_col][nxt]
-							tmp_buffer[l_col][nxt] = None
-					elif l_row == MATRIX_HEIGHT*8-1:
-						tmp_buffer[l_col][MATRIX_HEIGHT*8-1] = new_graphic[l_col][iter]
-		gfx_set_all(GFX_OFF)
-		for g_col in range(MATRIX_WIDTH*8):
-			for g_row in range(MATRIX_HEIGHT*8):
-				gfx_buffer[g_col][g_row] = 1 if tmp_buffer[g_col][g_row] == 1 else 0
-		gfx_render()
-		time.sleep(delay)
-				
-def gfx_read_buffer(g_x=None, g_y=None):
-    # Return the current state (on=1, off=0) of an individual pixel in the graphics buffer
-	# if no pixel is declared, it returns the whole gfx_buffer array
-    # Note that this buffer only reflects the operations of these gfx_ functions, since the buffer was last cleared
-    # The buffer does not reflect the effects of other library functions such as send_matrix_letter() or (static_message()
-	if g_x == None and g_y == None:
-		import copy
-		return copy.deepcopy(gfx_buffer)
-	elif (g_x in gfx_columns) and (g_y in gfx_rows):
-		return (gfx_buffer[g_x][g_y])
-		
-def gfx_render():
-    # All of the above gfx_ functions (except of the gfx_effect_ functions) only write to (or read from) a graphics buffer maintained in memory
-    # This command sends the entire buffer to the matrix array - use it to display the effect of one or more previous gfx_ functions
-	for g_col in range(8):
-		column_data = []
-		for matrix in reversed(range(NUM_MATRICES)):
-			val = 0x00
-			for px in range(8):
-				val += gfx_buffer[g_col + (matrix//MATRIX_HEIGHT)*8 ][px+(matrix%MATRIX_HEIGHT)*8] * pow(2,7-px)
-			column_data += [g_col+1, val]
-		send_bytes(column_data)
-
-def init():
-    # Initialise all of the MAX7219 chips (see datasheet for details of registers)
-    send_all_reg_byte(MAX7219_REG_SCANLIMIT, 7)   # show all 8 digits
-    send_all_reg_byte(MAX7219_REG_DECODEMODE, 0)  # using a LED matrix (not digits)
-    send_all_reg_byte(MAX7219_REG_DISPLAYTEST, 0) # no display test
-    clear_all()                                   # ensure the whole array is blank
-    brightness(3)                                 # set character intensity: range: 0..15
-    send_all_reg_byte(MAX7219_REG_SHUTDOWN, 1)    # not in shutdown mode (i.e start it up)
-    gfx_set_all(GFX_OFF)                          # clear the graphics buffer
+        first, last = max(0, start - (limit - 1)), min(last, start)
+    if first > last:
+        return
+    # minor = minor_start + floor((2*minor_length*step_number + steps) / (2*steps)), remainder kept in error
+    quotient, error = divmod(2*minor_length*first + steps, 2*steps)
+    minor = minor_start + quotient
+    major = start + first*step
+    for step_number in range(first, last + 1):
+        if 0 <= minor < minor_limit:
+            yield major, minor
+        major += step
+        error += 2*minor_length
+        if error >= 2*steps:
+            error -= 2*steps
+            minor += 1
+        elif error < 0:
+            error += 2*steps
+            minor -= 1
+
+def char_code(char):
+    # Return the character code (0-255) for a character given as a code or a one-character string
+    if isinstance(char, int):
+        return char % 0x100
+    return ord(char) % 0x100
+
+# ---------------------------------------
+# Library function definitions begin here
+# ---------------------------------------
+
+class Display(object):
+    # One array of width x height MAX7219 matrices on one chain, with its own graphics buffer and shadow registers
+    # transport: see multilineMAX7219_transport.py; if None, SPI bus#0 using CS0 (CE0) is opened on first use
+    # font: the font used by the text functions when none is given
+    # topology: the order of the matrices along the chain and their rotation (see Topology); by default the chain
+    #   runs up each column of matrices, as they are numbered
+    # The module-level functions below act on default_display, the array of MATRIX_WIDTH x MATRIX_HEIGHT matrices
+    # configured at the top of this script; create a Display for each further array, eg
+    #   panel = Display(8, 1, SpidevTransport(0, 1))
+    #   panel.init()
+    #   panel.scroll_message_horiz(["Hello"])
+    def __init__(self, width, height, transport=None, font=DEFAULT_FONT, use_numpy=GFX_NUMPY, topology=None):
+        self.width = width
+        self.height = height
+        self.num_matrices = width * height
+        self.matrices = range(self.num_matrices)
+        self.transport = transport
+        self.topology = topology or Topology(width, height)
+        self.font = font
+        self.pad_string = " " * self.num_matrices
+        # Graphics setup
+        self.gfx_rows = range(height * 8)
+        self.gfx_columns = range(width * 8)
+        # Graphics buffer used by the gfx_ functions
+        self.gfx_buffer = new_gfx_buffer(width, height, use_numpy)
+        # Background thread sending the graphics buffer, if started with start_render_thread()
+        self.render_thread = None
+        # Shadow copy of the registers of every MAX7219, as last written by this library: shadow_regs[matrix][register]
+        # None marks a register whose content is unknown (eg before init() or after a raw send_reg_byte())
+        self.shadow_regs = [[None] * 16 for m in self.matrices]
+        # The (register, data) word left in each MAX7219's shift register by the last transfer (None = unknown)
+        # A shortened transfer re-latches these words one step further down the chain
+        self.latched_words = [None] * self.num_matrices
+        # Held for every transfer (and for every frame of an animation), so that a render thread and the main
+        # thread can share the transport and the shadow registers
+        self.lock = threading.RLock()
+        # Index table: position_matrices[direction][position] is the matrix showing the character at that position
+        # of a message displayed by static_message()
+        self.position_matrices = {
+            DIR_RD: [l_row + l_col*height for l_row in reversed(range(height)) for l_col in range(width)],
+            DIR_RU: [l_row + l_col*height for l_row in range(height) for l_col in range(width)],
+            DIR_D:  [l_row + l_col*height for l_col in range(width) for l_row in reversed(range(height))],
+            DIR_U:  [l_row + l_col*height for l_col in range(width) for l_row in range(height)],
+        }
+        self.position_matrices[DIR_R] = self.position_matrices[DIR_RD]
+        # Index table: text_positions[matrix] is the position of the character shown by the matrix (DIR_RD ordering)
+        self.text_positions = [None] * self.num_matrices
+        for position, matrix in enumerate(self.position_matrices[DIR_RD]):
+            self.text_positions[matrix] = position
+        # Compiled scroll_message_vert() transitions, see scroll_message_vert_frames()
+        self.vert_frames_cache = OrderedDict()
+        # Performance counters, see stats(): function_stats[name] for each counted function, other_stats for the
+        # transfers made outside them; stats_local.current is the Stats of the counted call in progress in a thread
+        self.function_stats = {}
+        self.other_stats = Stats()
+        self.stats_local = threading.local()
+        # Frame hooks, see add_frame_hook(): frame_hooks[event] is the list of callbacks for that event
+        self.frame_hooks = {}
+        # The number of frames sent by gfx_render() so far, which numbers them for the frame hooks
+        self.render_frames = 0
+
+    def compile_font(self, font=None):
+        # Return the CompiledFont for font, or for the display's font if None
+        return compile_font(self.font if font is None else font)
+
+    def send_frame(self, frame):
+        # Send one frame: a list of [register, data] lists, see GfxBuffer.frame()
+        with self.lock:
+            self.current_stats().frames += 1
+            for column_data in self.topology.chain_frame(frame):
+                self.send_bytes(column_data)
+
+    def play(self, frames, scheduler):
+        # Send each frame (a list of [register, data] lists, see GfxBuffer.frame()) from an iterable of frames,
+        # pacing them by the FrameScheduler; returns the scheduler
+        scheduler.start()
+        frames = iter(frames)
+        pack = lambda: next(frames)
+        index = 0
+        while True:
+            frame, info = self.pack_frame(pack, index)
+            if frame is None:
+                break
+            self.send_packed_frame(frame, info)
+            index += 1
+            overruns = scheduler.overruns
+            start = clock()
+            scheduler.wait()
+            self.count_wait(clock() - start, scheduler.overruns - overruns)
+        return scheduler
+
+    def add_frame_hook(self, event, callback):
+        # Register callback(event, info) to be called for every frame of the animations, gfx_render() and
+        # static_message(), at event: BEFORE_PACK, AFTER_PACK or AFTER_TRANSFER. info is a dict:
+        # - function : the name of the library function sending the frame (see stats()), or None
+        # - index    : the number of the frame in the animation, from 0 (frames sent by gfx_render() are numbered
+        #              since the display was created, and those sent by the render thread since the thread started)
+        # - from AFTER_PACK: frame (the packed frame, see GfxBuffer.frame()), size (its bytes) and pack_time (seconds)
+        # - from AFTER_TRANSFER: transfer_time (seconds), transfers and bytes_sent (after the shadow registers
+        #   have left out any unchanged data)
+        # At the end of an animation, BEFORE_PACK is followed by AFTER_PACK with frame None and size 0
+        # The same dict is passed to all three events of a frame, so a callback can keep data in it for the next one
+        with self.lock:
+            self.frame_hooks.setdefault(event, []).append(callback)
+
+    def remove_frame_hook(self, event, callback):
+        # Unregister a callback registered by add_frame_hook()
+        with self.lock:
+            callbacks = self.frame_hooks.get(event, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self.frame_hooks.pop(event, None)
+
+    def fire_frame_hooks(self, event, info):
+        for callback in list(self.frame_hooks.get(event, ())):
+            callback(event, info)
+
+    def pack_frame(self, pack, index):
+        # Pack frame number index of an animation by calling pack(), firing the BEFORE_PACK and AFTER_PACK hooks
+        # Returns (frame, info) for send_packed_frame(); frame is None if pack() raised StopIteration (no more frames)
+        # info is None if no frame hooks are registered
+        if not self.frame_hooks:
+            try:
+                return pack(), None
+            except StopIteration:
+                return None, None
+        info = {'function': getattr(self.stats_local, 'name', None), 'index': index}
+        self.fire_frame_hooks(BEFORE_PACK, info)
+        start = clock()
+        try:
+            frame = pack()
+        except StopIteration:
+            frame = None
+        info['pack_time'] = clock() - start
+        info['frame'] = frame
+        info['size'] = sum(len(column_data) for column_data in frame) if frame else 0
+        self.fire_frame_hooks(AFTER_PACK, info)
+        return frame, info
+
+    def send_packed_frame(self, frame, info):
+        # Send a frame returned by pack_frame(), firing the AFTER_TRANSFER hooks
+        if info is None:
+            self.send_frame(frame)
+            return
+        with self.lock:
+            stats = self.current_stats()
+            transfers, bytes_sent = stats.transfers, stats.bytes_sent
+            start = clock()
+            self.send_frame(frame)
+            info['transfer_time'] = clock() - start
+            info['transfers'] = stats.transfers - transfers
+            info['bytes_sent'] = stats.bytes_sent - bytes_sent
+        self.fire_frame_hooks(AFTER_TRANSFER, info)
+
+    def counted_call(self, name, function, *args, **kwargs):
+        # Call function(*args, **kwargs), counting the call and its frames, transfers and times under name in stats()
+        # A call made while another counted call is in progress in the same thread (eg the clear_all() at the end of
+        # scroll_message_horiz()) is counted as part of the outer one
+        if getattr(self.stats_local, 'current', None) is not None:
+            return function(*args, **kwargs)
+        stats = Stats()
+        start = clock()
+        try:
+            return self.call_in_stats(stats, name, function, *args, **kwargs)
+        finally:
+            self.add_stats(name, stats, clock() - start)
+
+    def call_in_stats(self, stats, name, function, *args, **kwargs):
+        # Call function(*args, **kwargs), counting its frames, transfers and times in stats, as part of the function
+        # name (see add_stats()); eg for the frames of an animation sent from other threads
+        previous = getattr(self.stats_local, 'current', None), getattr(self.stats_local, 'name', None)
+        self.stats_local.current, self.stats_local.name = stats, name
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.stats_local.current, self.stats_local.name = previous
+
+    def add_stats(self, name, stats, seconds):
+        # Add the Stats of a completed call of the function name, which lasted seconds, to stats()
+        stats.calls = 1
+        stats.pack_time = seconds - stats.transfer_time - stats.sleep_time
+        with self.lock:
+            if name not in self.function_stats:
+                self.function_stats[name] = Stats()
+            self.function_stats[name].add(stats)
+
+    def count_wait(self, seconds, overruns=0):
+        # Count seconds spent waiting for a frame deadline, and the overruns it found, in stats()
+        with self.lock:
+            stats = self.current_stats()
+            stats.sleep_time += seconds
+            stats.overruns += overruns
+
+    def current_stats(self):
+        # The Stats to count a transfer, frame or wait in: that of the counted call in progress in this thread,
+        # or other_stats; call with lock held
+        return getattr(self.stats_local, 'current', None) or self.other_stats
+
+    def transfer(self, data, method='xfer2'):
+        # Send a list of bytes via the transport, counting the transfer in stats(); call with lock held
+        transport = self.get_transport()
+        start = clock()
+        getattr(transport, method)(data)
+        stats = self.current_stats()
+        stats.transfer_time += clock() - start
+        stats.transfers += 1
+        stats.bytes_sent += len(data)
+
+    def stats(self):
+        # Return the performance counters (see Stats) since the display was created or reset_stats() was called:
+        # {'total': counters, 'functions': {function name: counters}, 'other': counters}, each counters a dict
+        # 'functions' counts the calls of the animation and rendering functions (and 'render_thread' the frames sent
+        # by the render thread); 'other' the transfers made outside them, eg by send_bytes() called directly
+        # 'total' adds them all up, eg a total transfer_time close to the total of all times means that the array
+        # is limited by the SPI bus rather than by the CPU
+        with self.lock:
+            total = Stats()
+            total.add(self.other_stats)
+            functions = {}
+            for name, stats in self.function_stats.items():
+                total.add(stats)
+                functions[name] = stats.as_dict()
+            return {'total': total.as_dict(), 'functions': functions, 'other': self.other_stats.as_dict()}
+
+    def reset_stats(self):
+        # Reset all the performance counters to zero
+        with self.lock:
+            self.function_stats.clear()
+            self.other_stats = Stats()
+
+    def set_transport(self, new_transport):
+        # Send all further transfers via new_transport, eg a FakeTransport(num_matrices) to run without hardware,
+        # or a RecordingTransport; the previous transport is not closed. Call init() afterwards
+        with self.lock:
+            self.transport = new_transport
+            self.invalidate_shadow()
+
+    def set_topology(self, topology):
+        # Change the order of the matrices along the chain and their rotation (see Topology)
+        # The array is not redrawn: call init() or send the content again afterwards
+        with self.lock:
+            self.topology = topology
+            self.invalidate_shadow()
+
+    def get_transport(self):
+        # Return the transport, opening SPI bus#0 using CS0 (CE0) if none has been set
+        if self.transport is None:
+            with self.lock:
+                if self.transport is None:
+                    self.transport = SpidevTransport(0, 0)
+        return self.transport
+
+    def send_reg_byte(self, register, data):
+        # Send one byte of data to one register via SPI port, then raise CS to latch
+        # Note that subsequent sends will cycle this tuple through to successive MAX7219 chips
+        with self.lock:
+            self.transfer([register, data], 'xfer')
+            # The chain has been shifted by a partial transfer, so the shadow copy can no longer be trusted
+            self.invalidate_shadow()
+
+    def send_bytes(self, datalist, force=False):
+        # Send sequence of bytes (should be [register,data] tuples) via SPI port, then raise CS
+        # A full-length transfer is checked against the shadow copy of the registers first:
+        # - writes which would not change a register are replaced by NO_OP
+        # - if the words for the chips at the far end of the chain are all NO_OP, they are left out where it is safe
+        #   (ie the words they would re-latch from the previous transfer do not change anything either)
+        # - if nothing would change at all, no transfer takes place
+        # force=True sends datalist unchanged
+        with self.lock:
+            if force or len(datalist) != 2 * self.num_matrices:
+                self.transfer(list(datalist))
+                self.track_transfer(datalist)
+                return
+            words = []
+            first = self.num_matrices
+            for i in range(self.num_matrices):
+                register, data = datalist[2*i] & 0x0F, datalist[2*i+1] & 0xFF
+                if register != MAX7219_REG_NOOP and self.shadow_regs[self.num_matrices-1-i][register] != data:
+                    first = min(first, i)
+                    words += [register, data]
+                else:
+                    words += NO_OP
+            if first == self.num_matrices:
+                return
+            # The chips beyond the shortened transfer would re-latch the words now held by the chips nearer to the Pi
+            sent = self.num_matrices - first
+            for matrix in range(sent, self.num_matrices):
+                word = self.latched_words[matrix - sent]
+                if word is None or (word[0] != MAX7219_REG_NOOP and self.shadow_regs[matrix][word[0]] != word[1]):
+                    sent = self.num_matrices
+                    break
+            words = words[2*(self.num_matrices - sent):]
+            self.transfer(words)
+            self.track_transfer(words)
+
+    def track_transfer(self, datalist):
+        # Update shadow_regs and latched_words to reflect a transfer of datalist through the chain
+        if len(datalist) % 2:
+            self.invalidate_shadow()
+            return
+        words = [(datalist[i] & 0x0F, datalist[i+1] & 0xFF) for i in range(len(datalist)-2, -1, -2)]
+        self.latched_words[:] = (words + self.latched_words)[:self.num_matrices]
+        for matrix, word in enumerate(self.latched_words):
+            if word is None:
+                self.shadow_regs[matrix] = [None] * 16
+            elif word[0] != MAX7219_REG_NOOP:
+                self.shadow_regs[matrix][word[0]] = word[1]
+
+    def invalidate_shadow(self):
+        # Forget the shadow copy of the registers, so that the following transfers are sent in full
+        for matrix in self.matrices:
+            self.shadow_regs[matrix] = [None] * 16
+            self.latched_words[matrix] = None
+
+    def resync(self):
+        # Force a full rewrite of the digit registers of all MAX7219 chips from the shadow copy
+        # (registers of unknown content are cleared), eg after the array has been disconnected or power-cycled
+        for col in range(8):
+            column_data = []
+            for matrix in reversed(self.matrices):
+                data = self.shadow_regs[matrix][col+1]
+                column_data += [col+1, data or 0]
+            self.send_bytes(column_data, force=True)
+
+    def send_matrix_reg_byte(self, matrix, register, data):
+        # Send one byte of data to one register in just one MAX7219 without affecting others
+        # The register is written as given, even if the module is rotated (see Topology)
+        if matrix in self.matrices:
+            position = self.topology.chain_positions[matrix]
+            padded_data = NO_OP * (self.num_matrices - 1 - position) + [register, data] + NO_OP * position
+            self.send_bytes(padded_data)
+
+    def send_all_reg_byte(self, register, data):
+        # Send the same byte of data to the same register in all of the MAX7219 chips
+        self.send_bytes([register, data] * self.num_matrices)
+
+    def clear(self, matrix_list):
+        # Clear one or more specified MAX7219 matrices (argument(s) to be specified as a list even if just one)
+        # All of them are cleared by the same 8 transfers
+        self.send_matrix_columns(dict((matrix, BLANK_COLUMNS) for matrix in matrix_list))
+
+    def send_matrix_columns(self, columns):
+        # Send 8 column bytes to each of several MAX7219 matrices at once: columns is a dict {matrix: column bytes}
+        # The updates are combined into 8 transfers (one per column register), with NO_OP for the other matrices
+        frame = self.columns_frame(columns)
+        if frame:
+            self.send_frame(frame)
+
+    def columns_frame(self, columns):
+        # Return the frame (see play()) which sends columns, a dict {matrix: column bytes}, as send_matrix_columns()
+        # does; an empty frame if none of the matrices exist
+        columns = [(matrix, cols) for matrix, cols in columns.items() if matrix in self.matrices]
+        if not columns:
+            return []
+        frame = []
+        for col in range(8):
+            column_data = NO_OP * self.num_matrices
+            for matrix, cols in columns:
+                offset = 2 * (self.num_matrices - 1 - matrix)
+                column_data[offset] = col+1
+                column_data[offset+1] = cols[col]
+            frame.append(column_data)
+        return frame
+
+    @counted
+    def clear_all(self):
+        # Clear all of the connected MAX7219 matrices
+        for col in range(8):
+            self.send_all_reg_byte(col+1, 0)
+
+    @counted
+    def brightness(self, intensity):
+        # Set a specified brightness level on all of the connected MAX7219 matrices
+        # Intensity: 0-15 with 0=dimmest, 15=brightest; in practice the full range does not represent a large difference
+        intensity = int(max(0, min(15, intensity)))
+        self.send_bytes([MAX7219_REG_INTENSITY, intensity] * self.num_matrices)
+
+    def send_matrix_letter(self, matrix, char_code, font=None):
+        # Send one character from the specified font to a specified MAX7219 matrix
+        self.send_matrix_letters({matrix: char_code}, font)
+
+    def send_matrix_letters(self, letters, font=None):
+        # Send characters from the specified font to several MAX7219 matrices at once, in 8 transfers
+        # letters: a dict {matrix: character code or one-character string}
+        frame = self.letters_frame(letters, font)
+        if frame:
+            self.send_frame(frame)
+
+    def letters_frame(self, letters, font=None):
+        # Return the frame (see play()) which sends letters, a dict {matrix: character code or one-character string},
+        # as send_matrix_letters() does; an empty frame if none of the matrices exist
+        cols = self.compile_font(font).cols
+        return self.columns_frame(dict((matrix, cols[char_code(char)]) for matrix, char in letters.items()))
+
+    def send_matrix_shifted_letter(self, matrix, curr_code, next_code, progress, direction=DIR_L, font=None):
+        # Send to one MAX7219 matrix a combination of two specified characters, representing a partially-scrolled position
+        # progress: 0-7: how many pixels the characters are shifted: 0=curr_code fully displayed; 7=one pixel less than fully shifted to next_code
+        # With multiple matrices, this function sends many NO_OP tuples, limiting the scrolling speed achievable for a whole line
+        # scroll_message_horiz() and scroll_message_vert() are more efficient and can scroll a whole line of text faster
+        if matrix in self.matrices:
+            show_char = shifted_letter(self.compile_font(font), curr_code % 0x100, next_code % 0x100, progress % 8, direction)
+            if show_char:
+                self.send_frame(self.columns_frame({matrix: show_char}))
+
+    def send_matrix_shifted_letters(self, curr_letters, next_letters, progress, direction=DIR_L, font=None):
+        # Like send_matrix_shifted_letter(), for several matrices at once, in 8 transfers (see shifted_letters_frame())
+        frame = self.shifted_letters_frame(curr_letters, next_letters, progress, direction, font)
+        if frame:
+            self.send_frame(frame)
+
+    def shifted_letters_frame(self, curr_letters, next_letters, progress, direction=DIR_L, font=None):
+        # Return the frame (see play()) showing every matrix in curr_letters partially scrolled towards its character
+        # in next_letters: dicts {matrix: character code or one-character string}
+        # progress: 0-8: 0=curr_letters fully displayed; 8=next_letters fully displayed
+        # A matrix missing from next_letters keeps its character; matrices missing from curr_letters are left as they are
+        compiled_font = self.compile_font(font)
+        progress = max(0, min(8, int(progress)))
+        columns = {}
+        for matrix, curr_char in curr_letters.items():
+            next_char = next_letters.get(matrix, curr_char)
+            show_char = shifted_letter(compiled_font, char_code(curr_char), char_code(next_char), progress, direction)
+            if show_char:
+                columns[matrix] = show_char
+        return self.columns_frame(columns)
+
+    @counted
+    def shift_letters(self, curr_letters, next_letters, speed=3, direction=DIR_L, font=None):
+        # Scroll every matrix in curr_letters to its character in next_letters at the same time, eg to flip the cells
+        # of a status board; curr_letters is expected to be displayed already
+        # speed: 0-9 for practical purposes; speed does not have to integral; or a FrameScheduler
+        # direction: DIR_L, DIR_R, DIR_U or DIR_D
+        return self.play(self.shift_letters_frames(curr_letters, next_letters, direction, font), frame_scheduler(speed))
+
+    def shift_letters_frames(self, curr_letters, next_letters, direction=DIR_L, font=None):
+        # Generate the frames of shift_letters(), see play(): progress 1-8, ending with next_letters fully displayed
+        for progress in range(1, 9):
+            yield self.shifted_letters_frame(curr_letters, next_letters, progress, direction, font)
+
+    @counted
+    def static_message(self, message, direction=DIR_RD, delay=0, font=None):
+        # Send a stationary text message to the array of MAX7219 matrices
+        # Message will be truncated from the right to fit the array
+        # Message can be send in this directions:	DIR_RD	DIR_RU	DIR_D	DIR_U
+        # (e.g. message='012345678')				0 1 2 	6 7 8	0 3 6	2 5 8
+        #											3 4 5	3 4 5	1 4 7	1 4 7
+        #											6 7 8	0 1 2	2 5 8	0 3 6
+        # delay = x seconds can delay the appearance of the following character; or a FrameScheduler
+        # With delay=0, the whole message is sent at once, in 8 transfers
+        if not delay:
+            matrices = self.position_matrices.get(direction)
+            if matrices is not None:
+                letters = dict(zip(matrices, self.trim(message)))
+                frame, info = self.pack_frame(lambda: self.letters_frame(letters, font), 0)
+                if frame:
+                    self.send_packed_frame(frame, info)
+            return
+        scheduler = delay if isinstance(delay, FrameScheduler) else FrameScheduler(delay)
+        return self.play(self.static_message_frames(message, direction, font), scheduler)
+
+    def static_message_frames(self, message, direction=DIR_RD, font=None):
+        # Generate the frames of static_message(), see play(): one frame per character, addressed to its matrix only
+        message = self.trim(message)
+        matrices = self.position_matrices.get(direction)
+        if matrices is None:
+            return
+        cols = self.compile_font(font).cols
+        for idx, matrix in enumerate(matrices):
+            char = cols[ord(message[idx]) % 0x100]
+            frame = []
+            for col in range(8):
+                column_data = NO_OP * self.num_matrices
+                offset = 2 * (self.num_matrices - 1 - matrix)
+                column_data[offset:offset+2] = [col+1, char[col]]
+                frame.append(column_data)
+            yield frame
+
+    @counted
+    def scroll_message_horiz(self, messages, repeats=0, speed=3, direction=DIR_L, font=None, finish=True):
+        # Scroll some text messages across the lines, for a specified number of times (repeats)
+        # repeats=0 gives indefinite scrolling until script is interrupted
+        # speed: 0-9 for practical purposes; speed does not have to integral; or a FrameScheduler
+        # direction: DIR_L or DIR_R only; DIR_U & DIR_D will do nothing
+        # finish: True/False - True ensures array is clear at end, False ends with the last columns of the messages
+        #   still displayed on the array - this is included for completeness but rarely likely to be required in practice
+        # Scrolling starts with messages off the RHS(DIR_L)/LHS(DIR_R) of array, and ends with messages off the LHS/RHS
+        # If repeats>1, add space(s) at the ends 'message' in each row to separate the end of messages & start of its repeat
+        scheduler = self.play(self.scroll_message_horiz_frames(messages, repeats, direction, font), frame_scheduler(speed))
+        # Above algorithm leaves the last column of the last character displayed on the array, so optionally erase it
+        if finish:
+            self.clear_all()
+        return scheduler
+
+    def scroll_message_horiz_frames(self, messages, repeats=0, direction=DIR_L, font=None):
+        # Generate the frames of scroll_message_horiz(), see play()
+        if repeats <= 0:
+            indef = True
+        else:
+            indef = False
+            repeats = int(repeats)
+        longest_msg = max( [len(m) for m in messages] )
+        for row in range(len(messages)):
+            if len(messages[row]) < longest_msg:
+                messages[row] = self.trim(messages[row], longest_msg)
+        messages = messages * self.height
+        messages = messages[:self.height]
+        # The messages are rendered once into strips of column bytes; each pass scrolls across a combination of them
+        strips = [self.text_strip(m, font) for m in messages]
+        pad = self.text_strip(self.pad_string[:self.width], font)
+        width = 8 * self.width
+        # Repeatedly scroll the whole message (initially 'front-padded' with blanks) until the last char appears
+        if direction == DIR_L:
+            scroll_strips = [pad + m for m in strips]
+        elif direction == DIR_R:
+            scroll_strips = [m + pad for m in strips]
+        counter = repeats
+        while (counter > 0) or indef:
+            for frame in self.strip_frames(scroll_strips, direction):
+                yield frame
+            # After the first scroll, replace the blank 'front-padding' with the start of the same messages
+            if counter == repeats:
+                if direction == DIR_L:
+                    scroll_strips = [m[-width:] + m for m in strips]
+                elif direction == DIR_R:
+                    scroll_strips = [m + m[:width] for m in strips]
+            counter -= 1
+        # To finish, 'end-pad' the messages with blanks and scroll the end of the messages off the array
+        if direction == DIR_L:
+            scroll_strips = [m[-width:] + pad for m in strips]
+        elif direction == DIR_R:
+            scroll_strips = [pad + m[:width] for m in strips]
+        for frame in self.strip_frames(scroll_strips, direction):
+            yield frame
+
+    def text_strip(self, text, font=None):
+        # Render a text into a 'strip': a bytearray of the column bytes of all its characters, 8 per character
+        col_bytes = self.compile_font(font).col_bytes
+        return bytearray(b''.join([col_bytes[ord(char)] for char in text]))
+
+    @counted
+    def scroll_text_once(self, texts, delay, direction, font):
+        # Scrolls texts[line] once across a line , starting & ending with test on the array
+        # Not intended to be used as a user routine; if used, note different syntax: compulsory arguments & requires delay rather than speed
+        return self.scroll_strips_once([self.text_strip(text, font) for text in texts], delay, direction)
+
+    @counted
+    def scroll_strips_once(self, strips, delay, direction):
+        # Scroll strips[line] (see text_strip()) once across a line, like scroll_text_once()
+        # delay: seconds per frame, or a FrameScheduler
+        scheduler = delay if isinstance(delay, FrameScheduler) else FrameScheduler(delay)
+        return self.play(self.strip_frames(strips, direction), scheduler)
+
+    def strip_frames(self, strips, direction):
+        # Generate the frames which scroll strips[line] once across a line
+        # Each frame is a window of 8*width columns sliding over the strips: the bytes for one column register
+        # of all the matrices in a matrix row are every 8th byte of the window
+        length = len(strips[0]) // 8 - self.width
+        if direction == DIR_L:
+            offsets = range(8 * length)
+        elif direction == DIR_R:
+            offsets = range(8 * length, 0, -1)
+        else:
+            return
+        # the bottom row of matrices shows the last line
+        lines = list(reversed(strips[:self.height]))
+        row_data = bytearray(self.num_matrices)
+        for offset in offsets:
+            frame = []
+            for col in range(8):
+                for row in range(self.height):
+                    row_data[row::self.height] = lines[row][offset+col:offset+col+8*self.width:8]
+                column_data = [col+1, 0] * self.num_matrices
+                column_data[1::2] = row_data[::-1]
+                frame.append(column_data)
+            yield frame
+
+    @counted
+    def scroll_message_vert(self, old_message, new_message, speed=3, direction=DIR_U, font=None, finish=True):
+        # Transitions vertically between two different (truncated if necessary) text messages
+        # speed: 0-9 for practical purposes; speed does not have to integral; or a FrameScheduler
+        # direction: DIR_U or DIR_D only; DIR_L & DIR_R will do nothing
+        # finish: True/False : True completely displays new_message at end, False leaves the transition one pixel short
+        # False should be used to ensure smooth scrolling if another vertical scroll is to follow immediately
+        scheduler = self.play(self.scroll_message_vert_frames(old_message, new_message, direction, font), frame_scheduler(speed))
+        # above algorithm finishes one shift before fully displaying new_message, so optionally complete the display
+        if finish:
+            self.static_message(new_message, font=font)
+        return scheduler
+
+    def scroll_message_vert_frames(self, old_message, new_message, direction=DIR_U, font=None):
+        # Return the frames of scroll_message_vert(), see play()
+        # The frames for a pair of messages are compiled on first use and kept in vert_frames_cache (up to
+        # VERT_FRAMES_CACHE_SIZE transitions, the least recently used ones being dropped), so repeating a transition
+        # costs only the transfers
+        old_message = self.trim(old_message)
+        new_message = self.trim(new_message)
+        compiled_font = self.compile_font(font)
+        key = (old_message, new_message, direction, compiled_font)
+        with self.lock:
+            frames = self.vert_frames_cache.pop(key, None)
+            if frames is None:
+                frames = self.compile_vert_frames(old_message, new_message, direction, compiled_font)
+                if len(self.vert_frames_cache) >= VERT_FRAMES_CACHE_SIZE:
+                    self.vert_frames_cache.popitem(last=False)
+            self.vert_frames_cache[key] = frames
+        return frames
+
+    def compile_vert_frames(self, old_message, new_message, direction, compiled_font):
+        # Return the list of 8*height frames transitioning vertically from old_message to new_message (both trimmed)
+        # Each matrix row in turn scrolls by one row of matrices: during the pass iter, the matrix at text position
+        # (see text_positions) moves from the character at position + iter*width in the text old_message+new_message
+        # to the one a row further on (the other way round for DIR_D)
+        if direction == DIR_U:
+            text = old_message + new_message
+            step = self.width
+            first = 0
+        elif direction == DIR_D:
+            text = new_message + old_message
+            step = -self.width
+            first = self.num_matrices
+        else:
+            return []
+        codes = [char_code(char) for char in text]
+        frames = []
+        for iter in range(self.height):
+            for stage in range(8):
+                columns = {}
+                for matrix in self.matrices:
+                    index = first + self.text_positions[matrix] + iter*step
+                    columns[matrix] = shifted_letter(compiled_font, codes[index], codes[index + step], stage, direction)
+                frames.append(self.columns_frame(columns))
+        return frames
+
+    def trim(self, text, length=None):
+        # Trim or pad specified text to specified length (default: one character per matrix)
+        if length is None:
+            length = self.num_matrices
+        text += " " * length
+        text = text[:length]
+        return text
+
+    def gfx_set_px(self, g_x, g_y, state=GFX_INVERT):
+        # Set an individual pixel in the graphics buffer to on, off, or the inverse of its previous state
+        self.gfx_buffer.set_px(g_x, g_y, state)
+
+    def gfx_set_col(self, g_col, state=GFX_INVERT):
+        # Set an entire column in the graphics buffer to on, off, or the inverse of its previous state
+        self.gfx_buffer.set_col(g_col, state)
+
+    def gfx_set_all(self, state=GFX_INVERT):
+        # Set the entire graphics buffer to on, off, or the inverse of its previous state
+        self.gfx_buffer.set_all(state)
+
+    def gfx_line(self, start_x, start_y, end_x, end_y, state=GFX_INVERT, incl_endpoint=GFX_ON):
+        # Draw a straight line in the graphics buffer between the specified start- & end-points
+        # The line can be drawn by setting each affected pixel to either on, off, or the inverse of its previous state
+        # The final point of the line (end_x, end_y) can either be included (default) or omitted
+        # It can be usefully omitted if drawing another line starting from this previous endpoint using GFX_INVERT
+        self.gfx_buffer.plot(self.line_points(start_x, start_y, end_x, end_y, incl_endpoint), state)
+
+    def line_points(self, start_x, start_y, end_x, end_y, incl_endpoint=GFX_ON):
+        # Return the list of the points of a line (see gfx_line()) which lie within the graphics buffer
+        # Integer-only: each point is the one nearest the line along its longer axis (halves rounded up), and the
+        # line is clipped to the buffer along that axis before any point is computed
+        start_x, end_x = int(start_x), int(end_x)
+        start_y, end_y = int(start_y), int(end_y)
+        len_x = end_x - start_x
+        len_y = end_y - start_y
+        if len_x == 0 and len_y == 0:
+            if incl_endpoint and 0 <= start_x < 8*self.width and 0 <= start_y < 8*self.height:
+                return [(start_x, start_y)]
+            return []
+        if abs(len_x) > abs(len_y):
+            return list(line_steps(start_x, len_x, start_y, len_y, 8*self.width, 8*self.height, incl_endpoint))
+        return [(g_x, g_y) for g_y, g_x in
+                line_steps(start_y, len_y, start_x, len_x, 8*self.height, 8*self.width, incl_endpoint)]
+
+    def gfx_hline(self, start_x, end_x, g_y, state=GFX_INVERT):
+        # Draw a horizontal span of pixels in row g_y, from start_x to end_x (both included)
+        start_x, end_x = sorted((int(start_x), int(end_x)))
+        start_x, end_x = max(start_x, 0), min(end_x, 8*self.width - 1)
+        if 0 <= g_y < 8*self.height and start_x <= end_x:
+            self.gfx_buffer.span_x(int(g_y), start_x, end_x, state)
+
+    def gfx_vline(self, g_x, start_y, end_y, state=GFX_INVERT):
+        # Draw a vertical span of pixels in column g_x, from start_y to end_y (both included)
+        start_y, end_y = sorted((int(start_y), int(end_y)))
+        start_y, end_y = max(start_y, 0), min(end_y, 8*self.height - 1)
+        if 0 <= g_x < 8*self.width and start_y <= end_y:
+            self.gfx_buffer.span_y(int(g_x), start_y, end_y, state)
+
+    def gfx_rect(self, start_x, start_y, end_x, end_y, state=GFX_INVERT, fill=False):
+        # Draw a rectangle with the specified opposite corners (both included), either its outline or filled
+        # Every pixel is drawn once, so GFX_INVERT inverts the whole outline or area
+        start_x, end_x = sorted((int(start_x), int(end_x)))
+        start_y, end_y = sorted((int(start_y), int(end_y)))
+        if fill:
+            clip_x0, clip_x1 = max(start_x, 0), min(end_x, 8*self.width - 1)
+            clip_y0, clip_y1 = max(start_y, 0), min(end_y, 8*self.height - 1)
+            if clip_x0 <= clip_x1 and clip_y0 <= clip_y1:
+                self.gfx_buffer.fill_rect(clip_x0, clip_y0, clip_x1, clip_y1, state)
+            return
+        self.gfx_hline(start_x, end_x, start_y, state)
+        if end_y != start_y:
+            self.gfx_hline(start_x, end_x, end_y, state)
+        if end_y - start_y > 1:
+            self.gfx_vline(start_x, start_y + 1, end_y - 1, state)
+            if end_x != start_x:
+                self.gfx_vline(end_x, start_y + 1, end_y - 1, state)
+
+    def gfx_circle(self, centre_x, centre_y, radius, state=GFX_INVERT, fill=False):
+        # Draw a circle (midpoint algorithm, integer-only), either its outline or filled
+        # Every pixel is drawn once, so GFX_INVERT inverts the whole outline or area
+        centre_x, centre_y, radius = int(centre_x), int(centre_y), abs(int(radius))
+        # half_widths[d_y]: how far the circle extends left and right of the centre, d_y rows above/below it
+        half_widths = {}
+        points = set()
+        d_x, d_y, error = radius, 0, 1 - radius
+        while d_x >= d_y:
+            half_widths[d_y] = max(half_widths.get(d_y, 0), d_x)
+            half_widths[d_x] = max(half_widths.get(d_x, 0), d_y)
+            if not fill:
+                for p_x, p_y in ((d_x, d_y), (d_y, d_x)):
+                    points.update([(centre_x + p_x, centre_y + p_y), (centre_x - p_x, centre_y + p_y),
+                                   (centre_x + p_x, centre_y - p_y), (centre_x - p_x, centre_y - p_y)])
+            d_y += 1
+            if error < 0:
+                error += 2*d_y + 1
+            else:
+                d_x -= 1
+                error += 2*(d_y - d_x) + 1
+        if fill:
+            for d_y, half_width in half_widths.items():
+                self.gfx_hline(centre_x - half_width, centre_x + half_width, centre_y + d_y, state)
+                if d_y:
+                    self.gfx_hline(centre_x - half_width, centre_x + half_width, centre_y - d_y, state)
+            return
+        self.gfx_buffer.plot([(g_x, g_y) for g_x, g_y in points
+                              if 0 <= g_x < 8*self.width and 0 <= g_y < 8*self.height], state)
+
+    def gfx_polyline(self, points, state=GFX_INVERT, closed=False):
+        # Draw straight lines joining a sequence of (x, y) points; closed=True also joins the last point to the first
+        # Each line omits its endpoint (see gfx_line()), which is the start of the next one, so that every vertex is
+        # drawn once
+        points = [(int(g_x), int(g_y)) for g_x, g_y in points]
+        if closed and len(points) > 1:
+            points.append(points[0])
+        for (start_x, start_y), (end_x, end_y) in zip(points, points[1:]):
+            self.gfx_line(start_x, start_y, end_x, end_y, state, GFX_OFF)
+        if points and not closed:
+            self.gfx_line(points[-1][0], points[-1][1], points[-1][0], points[-1][1], state)
+
+    def gfx_letter(self, char_code, start_x=0, start_y=0, state=GFX_INVERT, font=None):
+        # Overlay one character from the specified font into the graphics buffer, at a specified x-y position
+        # The character is drawn by setting each affected pixel to either on, off, or the inverse of its previous state
+        # GFX_ON copies the whole 8x8 character cell, GFX_OFF turns off the pixels of the character
+        self.gfx_buffer.blit_glyph(self.compile_font(font), char_code, int(start_x), int(start_y), state)
+
+    def gfx_sprite_array(self, sprite, start_x=0, start_y=0, state=GFX_INVERT):
+        # Overlay a specified 2d array[x][y] into the graphics buffer, at a specified position
+        # The sprite is drawn by setting each affected pixel to either on, off, or the inverse of its previous state
+        # GFX_ON copies all of the sprite's pixels, GFX_OFF turns off the pixels which are set in the sprite
+        # Sprite is an m-pixel (wide) x n-pixel hide array, eg [[0,0,1,0],[1,1,1,1],[0,0,1,0]] for a cross
+        self.gfx_buffer.blit_sprite(sprite, int(start_x), int(start_y), state)
+
+    def gfx_sprite(self, sprite, start_x=0, start_y=0, state=GFX_INVERT):
+        # Overlay a compiled Sprite into the graphics buffer, at a specified position
+        # GFX_ON copies the sprite's pixels within its mask, GFX_OFF turns off and GFX_INVERT inverts the pixels which
+        # are set in the sprite; much faster than gfx_sprite_array() for a sprite drawn many times
+        self.gfx_buffer.blit_compiled(sprite, int(start_x), int(start_y), state)
+
+    @counted
+    def gfx_scroll_towards(self, new_graphic=GFX_OFF, repeats=0, speed=3, direction=DIR_L, finish=True):
+        # Scrolls another graphic (2d array, same width and height like gfx_buffer: (8*width) x (8*height) )
+        # to the chosen direction.
+        # repeats=0 gives indefinite scrolling until script is interrupted
+        # speed: 0-9 for practical purposes; speed does not have to integral; or a FrameScheduler
+        # direction: DIR_L, DIR_R, DIR_U, DIR_D, or the diagonals DIR_LU, DIR_RU, DIR_LD, DIR_RD
+        return self.play(self.gfx_scroll_towards_frames(new_graphic, repeats, direction), frame_scheduler(speed))
+
+    def gfx_scroll_towards_frames(self, new_graphic=GFX_OFF, repeats=0, direction=DIR_L):
+        # Generate the frames of gfx_scroll_towards(), see play()
+        if repeats <= 0:
+            indef = True
+        else:
+            indef = False
+            repeats = int(repeats)
+        # both graphics are held as packed columns (bit 0 = bottom row), from which each step takes its incoming edge
+        columns, rows = 8*self.width, 8*self.height
+        buffer = self.gfx_buffer
+        new_graphic = graphic_edge(new_graphic, range(columns), 0, rows)
+        old_graphic = [buffer.get_column_bits(g_x) for g_x in range(columns)]
+        #loop
+        while indef or repeats > 0:
+            repeats -= 1
+            if direction in (DIR_LU, DIR_RU, DIR_LD, DIR_RD):
+                # diagonally, the old graphic moves out as the new one moves in from the opposite corner, both by
+                # whole columns shifted up or down; non-square arrays step the shorter axis only on some frames
+                sign_x = -1 if direction & DIR_L else 1
+                sign_y = 1 if direction & DIR_U else -1
+                steps = max(columns, rows)
+                for step in range(1, steps + 1):
+                    offset_x = (2*step*columns + steps) // (2*steps)
+                    offset_y = sign_y * ((2*step*rows + steps) // (2*steps))
+                    for g_x in range(columns):
+                        old_x = g_x - sign_x*offset_x
+                        new_x = old_x + sign_x*columns
+                        bits = 0
+                        if 0 <= old_x < columns:
+                            bits |= shift_bits(old_graphic[old_x], offset_y)
+                        if 0 <= new_x < columns:
+                            bits |= shift_bits(new_graphic[new_x], offset_y - sign_y*rows)
+                        buffer.put_column_bits(g_x, bits & ((1 << rows) - 1))
+                    yield buffer.frame()
+            elif direction & DIR_L:
+                for l_col in range(columns):
+                    buffer.scroll_packed(DIR_L, 0, columns, 0, rows, 1, [new_graphic[l_col]])
+                    yield buffer.frame()
+            elif direction & DIR_R:
+                for l_col in reversed(range(columns)):
+                    buffer.scroll_packed(DIR_R, 0, columns, 0, rows, 1, [new_graphic[l_col]])
+                    yield buffer.frame()
+            elif direction & DIR_U:
+                for l_row in reversed(range(rows)):
+                    buffer.scroll_packed(DIR_U, 0, columns, 0, rows, 1, None,
+                                         [(bits >> l_row) & 0x01 for bits in new_graphic])
+                    yield buffer.frame()
+            elif direction & DIR_D:
+                for l_row in range(rows):
+                    buffer.scroll_packed(DIR_D, 0, columns, 0, rows, 1, None,
+                                         [(bits >> l_row) & 0x01 for bits in new_graphic])
+                    yield buffer.frame()
+            new_graphic, old_graphic = old_graphic, new_graphic
+
+    def gfx_scroll(self, direction=DIR_L, new_graphic=GFX_OFF, start_x=0, extent_x=None, start_y=0, extent_y=None, distance=1):
+        # Scroll the specified area of the graphics buffer by (distance) pixel in the given direction
+        # direction: any of DIR_U, DIR_D, DIR_L, DIR_R, or the diagonals DIR_LU, DIR_RU, DIR_LD, DIR_RD
+        # Pixels outside the rectangle are unaffected; pixels scrolled outside the rectangle are discarded
+        # The 'new' pixels in the gap created are either set to on or off or in the new graphic
+        # extent_x, extent_y: None (default) extends the area to the right-hand/top edge of the array
+        if extent_x is None:
+            extent_x = 8*self.width
+        if extent_y is None:
+            extent_y = 8*self.height
+        distance = abs(int(distance))
+        start_x  = max(0, min(8*self.width - 1 , int(start_x)))
+        extent_x = max(0, min(8*self.width - start_x, int(extent_x)))
+        start_y  = max(0, min(8*self.height - 1, int(start_y)))
+        extent_y = max(0, min(8*self.height - start_y, int(extent_y)))
+        # only the incoming edge of new_graphic is read (see GfxBuffer.scroll())
+        self.gfx_buffer.scroll(direction, new_graphic, start_x, extent_x, start_y, extent_y, distance)
+
+    @counted
+    def gfx_effect_wipe(self, new_graphic, speed=3, transition=DIR_R):
+        # Transition from displayed graphic to another graphic by a 'wipe'
+        # speed: 0-9 for practical purposes; speed does not have to integral; or a FrameScheduler
+        # transition: DIR_U, DIR_D, DIR_L, DIR_R, DIR_RU, DIR_RD, DIR_LU, DIR_LD
+        return self.play(self.gfx_effect_wipe_frames(new_graphic, transition), frame_scheduler(speed))
+
+    def gfx_effect_wipe_frames(self, new_graphic, transition=DIR_R):
+        # Generate the frames of gfx_effect_wipe(), see play()
+        #errorhandling
+        if new_graphic == GFX_OFF:
+            new_graphic = [([0] * 8*self.height)] * self.width*8
+        elif new_graphic == GFX_ON:
+            new_graphic = [([1] * 8*self.height)] * self.width*8
+        else:
+            if ( not ( isinstance(new_graphic, list) ) ):
+                new_graphic = []
+            for (i, item) in enumerate(new_graphic):
+                if (not isinstance(item, list)):
+                    item = []
+                new_graphic[i] = (item + ([0]*8*self.height))[:8*self.height]
+            new_graphic = (new_graphic + ([ [0] * 8*self.height ] * self.width*8) )[:self.width*8]
+
+        maximum = max(self.height*8, self.width*8)
+        if transition == DIR_L:
+            for g_col in reversed(range(self.width*8)):
+                self.gfx_buffer.put_column(g_col, new_graphic[g_col])
+                yield self.gfx_buffer.frame()
+        elif transition == DIR_R:
+            for g_col in range(self.width*8):
+                self.gfx_buffer.put_column(g_col, new_graphic[g_col])
+                yield self.gfx_buffer.frame()
+        elif transition == DIR_D:
+            for g_row in reversed(range(self.height*8)):
+                for g_col in range(self.width*8):
+                    self.gfx_buffer.put_px(g_col, g_row, new_graphic[g_col][g_row])
+                yield self.gfx_buffer.frame()
+        elif transition == DIR_U:
+            for g_row in range(self.height*8):
+                for g_col in range(self.width*8):
+                    self.gfx_buffer.put_px(g_col, g_row, new_graphic[g_col][g_row])
+                yield self.gfx_buffer.frame()
+        elif transition == DIR_RU:
+            for iter in range( self.height*8 + self.width*8 - 1):
+                for stage in range(min(iter + 1,maximum)):
+                    if iter - stage < self.width*8 and stage < self.height*8:
+                        self.gfx_buffer.put_px(iter - stage, stage, new_graphic[iter - stage][stage])
+                yield self.gfx_buffer.frame()
+        elif transition == DIR_LD:
+            for iter in reversed(range( self.height*8 + self.width*8 - 1)):
+                for stage in range(min(iter + 1,maximum)):
+                    if iter - stage < self.width*8 and stage < self.height*8:
+                        self.gfx_buffer.put_px(iter - stage, stage, new_graphic[iter - stage][stage])
+                yield self.gfx_buffer.frame()
+        elif transition == DIR_RD:
+            for iter in range( self.height*8 + self.width*8 - 1):
+                for stage in range(min(iter + 1,maximum)):
+                    if self.height*8-1 - iter + stage >= 0 and stage < self.width*8:
+                        self.gfx_buffer.put_px(stage, self.height*8-1 - iter + stage, new_graphic[stage][self.height*8-1 - iter + stage])
+                yield self.gfx_buffer.frame()
+        elif transition == DIR_LU:
+            for iter in reversed(range( self.height*8 + self.width*8 - 1)):
+                for stage in range(min(iter + 1,maximum)):
+                    if self.height*8-1 - iter + stage >= 0 and stage < self.width*8:
+                        self.gfx_buffer.put_px(stage, self.height*8-1 - iter + stage, new_graphic[stage][self.height*8-1 - iter + stage])
+                yield self.gfx_buffer.frame()
+
+    @counted
+    def gfx_effect_rain(self, new_graphic, speed=3, seed=None):
+        # Sends pixels from top to its position (with random speed for every column)
+        # new_graphic has to be a 2d array with same width and height like gfx_buffer: 8*width x 8*height
+        # speed: 0-9 for practical purposes; speed does not have to integral; or a FrameScheduler
+        # seed: optional seed of the random speeds, so that the effect is reproducible
+        return self.play(self.gfx_effect_rain_frames(new_graphic, seed), frame_scheduler(speed, RAIN_PIXELS_PER_FRAME))
+
+    def gfx_effect_rain_frames(self, new_graphic, seed=None):
+        # Generate the frames of gfx_effect_rain(), see play()
+        # Each frame, a pixel of new_graphic (from its bottom row up) enters each column at the top, and every pixel
+        # falling in the column drops by the column's speed, stopping on the pixel below; each column is held as the
+        # number of pixels landed at its bottom and the rows of those still falling, and only changed columns are set
+        if ( not ( isinstance(new_graphic, list) ) ):
+            return
+        columns, rows = 8*self.width, 8*self.height
+        top = rows - 1
+        buffer = self.gfx_buffer
+        speeds = [(randrange if seed is None else Random(seed).randrange)(2,6) for c in range(columns)]
+        # pixel i of column l_col (which lands on row i) is lit if bit i of targets[l_col] is set
+        targets = []
+        for l_col in range(columns):
+            column = new_graphic[l_col] if l_col < len(new_graphic) and isinstance(new_graphic[l_col], list) else []
+            bits = 0
+            for l_row, px in enumerate(column[:rows]):
+                if px == 1:
+                    bits |= 1 << l_row
+            targets.append(bits)
+        landed = [0] * columns
+        falling = [[] for l_col in range(columns)]
+        shown = [None] * columns
+        for step in range(rows):
+            for l_col in range(columns):
+                if landed[l_col] == rows:
+                    continue
+                drops = falling[l_col]
+                below = landed[l_col] - 1
+                for k, l_row in enumerate(drops):
+                    below = drops[k] = max(below + 1, l_row - speeds[l_col])
+                drops.append(top)
+                settled = 0
+                while settled < len(drops) and drops[settled] == landed[l_col] + settled:
+                    settled += 1
+                del drops[:settled]
+                landed[l_col] += settled
+                target = targets[l_col]
+                bits = target & ((1 << landed[l_col]) - 1)
+                for k, l_row in enumerate(drops):
+                    bits |= ((target >> (landed[l_col] + k)) & 0x01) << l_row
+                if bits != shown[l_col]:
+                    buffer.put_column_bits(l_col, bits)
+                    shown[l_col] = bits
+            yield buffer.frame()
+
+    def gfx_read_buffer(self, g_x=None, g_y=None):
+        # Return the current state (on=1, off=0) of an individual pixel in the graphics buffer
+        # if no pixel is declared, it returns the whole graphics buffer as a 2d array[x][y]
+        # Note that this buffer only reflects the operations of these gfx_ functions, since the buffer was last cleared
+        # The buffer does not reflect the effects of other library functions such as send_matrix_letter() or (static_message()
+        if g_x == None and g_y == None:
+            return self.gfx_buffer.to_lists()
+        elif (g_x in self.gfx_columns) and (g_y in self.gfx_rows):
+            return self.gfx_buffer.get_px(g_x, g_y)
+
+    @counted
+    def gfx_render(self):
+        # All of the above gfx_ functions (except of the gfx_effect_ functions) only write to (or read from) a graphics buffer maintained in memory
+        # This command sends the entire buffer to the matrix array - use it to display the effect of one or more previous gfx_ functions
+        # While the render thread is running (see start_render_thread()), this is the same as present()
+        if self.render_thread is not None:
+            self.render_thread.present(self.gfx_buffer)
+            return
+        with self.lock:
+            index = self.render_frames
+            self.render_frames += 1
+        self.send_packed_frame(*self.pack_frame(self.gfx_buffer.frame, index))
+
+    def start_render_thread(self):
+        # Opt-in: start a background thread (see RenderThread) which sends the graphics buffer to the array
+        # From now on gfx_render()/present() return without waiting for the transfer, and the gfx_ functions draw into
+        # the graphics buffer while the previous frame is being sent; flush() waits until it has been sent
+        if self.render_thread is None:
+            self.render_thread = RenderThread(self)
+            self.render_thread.start()
+
+    def stop_render_thread(self):
+        # Send the last presented frame and stop the render thread; gfx_render() blocks again afterwards
+        if self.render_thread is not None:
+            self.render_thread.stop()
+            self.render_thread = None
+
+    def present(self):
+        # Hand the graphics buffer over to the render thread, without waiting for it to be sent
+        # Without a render thread, the buffer is sent at once (like gfx_render())
+        if self.render_thread is not None:
+            self.render_thread.present(self.gfx_buffer)
+        else:
+            self.gfx_render()
+
+    def flush(self):
+        # Wait until the frame last handed to the render thread (by gfx_render() or present()) has been sent
+        # Without a render thread, frames are sent before gfx_render() returns, so there is nothing to wait for
+        render_thread = self.render_thread
+        if render_thread is not None:
+            render_thread.flush()
+
+    @counted
+    def init(self):
+        # Initialise all of the MAX7219 chips (see datasheet for details of registers)
+        self.get_transport()                                # open the SPI bus, unless a transport has been set
+        self.invalidate_shadow()                            # the chips may have been reset, so send everything in full
+        self.send_all_reg_byte(MAX7219_REG_SCANLIMIT, 7)    # show all 8 digits
+        self.send_all_reg_byte(MAX7219_REG_DECODEMODE, 0)   # using a LED matrix (not digits)
+        self.send_all_reg_byte(MAX7219_REG_DISPLAYTEST, 0)  # no display test
+        self.clear_all()                                    # ensure the whole array is blank
+        self.brightness(3)                                  # set character intensity: range: 0..15
+        self.send_all_reg_byte(MAX7219_REG_SHUTDOWN, 1)     # not in shutdown mode (i.e start it up)
+        self.gfx_set_all(GFX_OFF)                           # clear the graphics buffer
+
+# The array configured at the top of this script, used by the module-level functions below
+default_display = Display(MATRIX_WIDTH, MATRIX_HEIGHT, font=DEFAULT_FONT,
+                          topology=Topology(MATRIX_WIDTH, MATRIX_HEIGHT, MATRIX_ORDER, MATRIX_ROTATION))
+# Graphics buffer of the default display: gfx_buffer[x][y] still reads a pixel as in earlier versions, but is
+# read-only (draw with the gfx_ functions; gfx_read_buffer() returns a copy as a 2d array)
+gfx_buffer    = default_display.gfx_buffer
+# Shadow registers & lock of the default display
+shadow_regs   = default_display.shadow_regs
+latched_words = default_display.latched_words
+spi_lock      = default_display.lock
+
+# Module-level library functions: the methods of default_display (see Display for their documentation)
+play                        = default_display.play
+set_transport               = default_display.set_transport
+get_transport               = default_display.get_transport
+set_topology                = default_display.set_topology
+stats                       = default_display.stats
+reset_stats                 = default_display.reset_stats
+add_frame_hook              = default_display.add_frame_hook
+remove_frame_hook           = default_display.remove_frame_hook
+send_frame                  = default_display.send_frame
+send_reg_byte               = default_display.send_reg_byte
+send_bytes                  = default_display.send_bytes
+track_transfer              = default_display.track_transfer
+invalidate_shadow           = default_display.invalidate_shadow
+resync                      = default_display.resync
+send_matrix_reg_byte        = default_display.send_matrix_reg_byte
+send_all_reg_byte           = default_display.send_all_reg_byte
+clear                       = default_display.clear
+send_matrix_columns         = default_display.send_matrix_columns
+columns_frame               = default_display.columns_frame
+clear_all                   = default_display.clear_all
+brightness                  = default_display.brightness
+send_matrix_letter          = default_display.send_matrix_letter
+send_matrix_letters         = default_display.send_matrix_letters
+letters_frame               = default_display.letters_frame
+send_matrix_shifted_letter  = default_display.send_matrix_shifted_letter
+send_matrix_shifted_letters = default_display.send_matrix_shifted_letters
+shifted_letters_frame       = default_display.shifted_letters_frame
+shift_letters               = default_display.shift_letters
+shift_letters_frames        = default_display.shift_letters_frames
+static_message              = default_display.static_message
+static_message_frames       = default_display.static_message_frames
+scroll_message_horiz        = default_display.scroll_message_horiz
+scroll_message_horiz_frames = default_display.scroll_message_horiz_frames
+text_strip                  = default_display.text_strip
+scroll_text_once            = default_display.scroll_text_once
+scroll_strips_once          = default_display.scroll_strips_once
+strip_frames                = default_display.strip_frames
+scroll_message_vert         = default_display.scroll_message_vert
+scroll_message_vert_frames  = default_display.scroll_message_vert_frames
+trim                        = default_display.trim
+gfx_set_px                  = default_display.gfx_set_px
+gfx_set_col                 = default_display.gfx_set_col
+gfx_set_all                 = default_display.gfx_set_all
+gfx_line                    = default_display.gfx_line
+line_points                 = default_display.line_points
+gfx_hline                   = default_display.gfx_hline
+gfx_vline                   = default_display.gfx_vline
+gfx_rect                    = default_display.gfx_rect
+gfx_circle                  = default_display.gfx_circle
+gfx_polyline                = default_display.gfx_polyline
+gfx_letter                  = default_display.gfx_letter
+gfx_sprite_array            = default_display.gfx_sprite_array
+gfx_sprite                  = default_display.gfx_sprite
+gfx_scroll_towards          = default_display.gfx_scroll_towards
+gfx_scroll_towards_frames   = default_display.gfx_scroll_towards_frames
+gfx_scroll                  = default_display.gfx_scroll
+gfx_effect_wipe             = default_display.gfx_effect_wipe
+gfx_effect_wipe_frames      = default_display.gfx_effect_wipe_frames
+gfx_effect_rain             = default_display.gfx_effect_rain
+gfx_effect_rain_frames      = default_display.gfx_effect_rain_frames
+gfx_read_buffer             = default_display.gfx_read_buffer
+gfx_render                  = default_display.gfx_render
+start_render_thread         = default_display.start_render_thread
+stop_render_thread          = default_display.stop_render_thread
+present                     = default_display.present
+flush                       = default_display.flush
+init                        = default_display.init
 
 # -----------------------------------------------------
 # Library function definitions end here
@@ -837,28 +2340,28 @@ if __name__ == "__main__":
             clear_all()
     except IndexError:
         # If no arguments given, show help text
-        print "multilineMAX7219.py"
-        print "Scrolls a message across an m x n array of MAX7219 8x8 LED boards"
-        print "Run syntax:"
-        print "  python multilineMAX7219.py message [repeats [speed [direction [font]]]]"
-        print "    or, if the file has been made executable with chmod +x multilineMAX7219.py :"
-        print "      ./multilineMAX7219.py message [repeats [speed [direction [font]]]]"
-        print "Parameters:"
-        print "  (none)               : displays this help information"
-        print "  message              : any text to be displayed on the array"
-        print "                         if message is more than one word, it must be enclosed in 'quotation marks'"
-        print "                         Note: include blank space(s) at the end of 'message' if it is to be displayed multiple times"
-        print "  repeats (optional)   : number of times the message is scrolled"
-        print "                         repeats = 0 scrolls indefinitely until <Ctrl<C> is pressed"
-        print "                         if omitted, 'repeats' defaults to 0 (indefinitely)"
-        print "  speed (optional)     : how fast the text is scrolled across the array"
-        print "                         1 (v.slow) to 9 (v.fast) inclusive (not necessarily integral)"
-        print "                         if omitted, 'speed' defaults to 3"
-        print "  direction (optional) : direction the text is scrolled"
-        print "                         L or R - if omitted, 'direction' defaults to L"
-        print "  font (optional)      : font to use for the displayed text"
-        print "                         CP437, SINCLAIRS, LCD or TINY only - default 'font' if not recognized is CP437"
-        print "multilineMAX7219.py can also be imported as a module to provide a wider range of functions for driving the array"
-        print "  See documentation within the script for details of these functions, and how to setup the library and the array"
+        print("multilineMAX7219.py")
+        print("Scrolls a message across an m x n array of MAX7219 8x8 LED boards")
+        print("Run syntax:")
+        print("  python multilineMAX7219.py message [repeats [speed [direction [font]]]]")
+        print("    or, if the file has been made executable with chmod +x multilineMAX7219.py :")
+        print("      ./multilineMAX7219.py message [repeats [speed [direction [font]]]]")
+        print("Parameters:")
+        print("  (none)               : displays this help information")
+        print("  message              : any text to be displayed on the array")
+        print("                         if message is more than one word, it must be enclosed in 'quotation marks'")
+        print("                         Note: include blank space(s) at the end of 'message' if it is to be displayed multiple times")
+        print("  repeats (optional)   : number of times the message is scrolled")
+        print("                         repeats = 0 scrolls indefinitely until <Ctrl<C> is pressed")
+        print("                         if omitted, 'repeats' defaults to 0 (indefinitely)")
+        print("  speed (optional)     : how fast the text is scrolled across the array")
+        print("                         1 (v.slow) to 9 (v.fast) inclusive (not necessarily integral)")
+        print("                         if omitted, 'speed' defaults to 3")
+        print("  direction (optional) : direction the text is scrolled")
+        print("                         L or R - if omitted, 'direction' defaults to L")
+        print("  font (optional)      : font to use for the displayed text")
+        print("                         CP437, SINCLAIRS, LCD or TINY only - default 'font' if not recognized is CP437")
+        print("multilineMAX7219.py can also be imported as a module to provide a wider range of functions for driving the array")
+        print("  See documentation within the script for details of these functions, and how to setup the library and the array")
                                                                
 
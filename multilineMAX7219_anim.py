@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# ---------------------------------------------------------
+# Filename: multilineMAX7219_anim.py
+# ---------------------------------------------------------
+# Compiled animations for the multilineMAX7219.py library
+# ---------------------------------------------------------
+# Any animation - the frames of a library effect (eg
+#   scroll_message_horiz_frames(), gfx_effect_wipe_frames()) or a
+#   sequence of graphics buffers - can be compiled once into a file
+#   of ready-to-send transfers, and then played back any number of
+#   times without running the effect code again:
+#     import multilineMAX7219 as LEDMatrix
+#     import multilineMAX7219_anim as LEDAnim
+#     LEDAnim.compile_animation("intro.anim", LEDMatrix.gfx_effect_rain_frames(graphic), speed=5)
+#     LEDAnim.play_animation("intro.anim", repeats=0)
+# Frames drawn with the gfx_ functions can be added one by one:
+#     with LEDAnim.AnimationWriter("clock.anim", LEDMatrix.MATRIX_WIDTH, LEDMatrix.MATRIX_HEIGHT) as writer:
+#         ...draw with the gfx_ functions...
+#         writer.add_frame(LEDMatrix.gfx_buffer.frame(), 0.5)
+# ---------------------------------------------------------
+# File format (all numbers little-endian):
+# - header: 8 bytes 'MX7219AN', format version (1 byte),
+#   width & height in matrices (2 bytes each), number of frames
+#   (4 bytes)
+# - each frame: its duration in microseconds (4 bytes), the number
+#   of transfers (1 byte), then each transfer: its length (2 bytes)
+#   and the bytes to send
+# Each frame is delta-encoded against the previous one: the
+#   transfers are those the library would send with its shadow
+#   registers (see send_bytes()), starting from an unknown state,
+#   so words which do not change a register are NO_OP and
+#   transfers which change nothing are left out
+# Playback maps the file into memory (mmap) and sends the transfers
+#   as they are, so it costs hardly any CPU time
+# ---------------------------------------------------------
+
+import mmap
+import struct
+
+import multilineMAX7219 as LEDMatrix
+from multilineMAX7219_transport import RecordingTransport
+
+ANIM_MAGIC   = b'MX7219AN'
+ANIM_VERSION = 1
+ANIM_HEADER  = struct.Struct('<8sBHHI')  # magic, version, width, height, number of frames
+ANIM_FRAME   = struct.Struct('<IB')      # duration (microseconds), number of transfers
+ANIM_XFER    = struct.Struct('<H')       # length of a transfer
+
+
+class AnimationWriter(object):
+    # Writes a compiled animation file for an array of width x height matrices, frame by frame
+    # topology: the wiring of the array (see multilineMAX7219.Topology), by default the matrices in their numbered order
+    # Use as a context manager, or call close() at the end: the number of frames is written into the header then
+    def __init__(self, path, width, height, topology=None):
+        self.width = width
+        self.height = height
+        self.frames = 0
+        self.file = open(path, 'wb')
+        self.file.write(ANIM_HEADER.pack(ANIM_MAGIC, ANIM_VERSION, width, height, 0))
+        # The delta encoding is done by a display of the same size whose transfers are recorded, not sent
+        self.encoder = LEDMatrix.Display(width, height, RecordingTransport(), topology=topology)
+
+    def add_frame(self, frame, duration):
+        # Add a frame (a list of [register, data] lists, see GfxBuffer.frame()) to be displayed for duration seconds
+        self.encoder.send_frame(frame)
+        transfers = [data for method, data in self.encoder.transport.log]
+        self.encoder.transport.clear()
+        if len(transfers) > 255:
+            # checked before writing, so that the file is left complete up to the previous frame; the encoder
+            # forgets the frame, so that the next one is encoded against an unknown state
+            self.encoder.invalidate_shadow()
+            raise ValueError("frame %d needs %d transfers, at most 255 can be compiled"
+                             % (self.frames, len(transfers)))
+        self.file.write(ANIM_FRAME.pack(int(round(duration * 1000000)), len(transfers)))
+        for data in transfers:
+            self.file.write(ANIM_XFER.pack(len(data)))
+            self.file.write(data)
+        self.frames += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.seek(0)
+            self.file.write(ANIM_HEADER.pack(ANIM_MAGIC, ANIM_VERSION, self.width, self.height, self.frames))
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Animation(object):
+    # A compiled animation file, mapped into memory
+    # frames: a list of (duration in seconds, [(start, end) of each transfer in data]) tuples, one per frame
+    def __init__(self, path):
+        with open(path, 'rb') as anim_file:
+            self.data = mmap.mmap(anim_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < ANIM_HEADER.size:
+            self.data.close()
+            raise ValueError("%s is not a compiled animation: too short for its header" % path)
+        magic, version, self.width, self.height, num_frames = ANIM_HEADER.unpack_from(self.data, 0)
+        if magic != ANIM_MAGIC or version != ANIM_VERSION:
+            self.data.close()
+            raise ValueError("%s is not a compiled animation of a known version (magic %r, version %d)"
+                             % (path, magic, version))
+        self.frames = []
+        offset = ANIM_HEADER.size
+        try:
+            for frame in range(num_frames):
+                duration, num_transfers = ANIM_FRAME.unpack_from(self.data, offset)
+                offset += ANIM_FRAME.size
+                transfers = []
+                for transfer in range(num_transfers):
+                    length, = ANIM_XFER.unpack_from(self.data, offset)
+                    offset += ANIM_XFER.size
+                    transfers.append((offset, offset + length))
+                    offset += length
+                if offset > len(self.data):
+                    break
+                self.frames.append((duration / 1000000.0, transfers))
+        except struct.error:
+            pass
+        if len(self.frames) < num_frames:
+            self.data.close()
+            raise ValueError("%s is truncated: %d of its %d frames are complete" % (path, len(self.frames), num_frames))
+
+    def play(self, repeats=1, display=None):
+        # Play the animation on a display (default: the library's default display) of the same size
+        # repeats=0 plays it indefinitely until the script is interrupted; returns the FrameScheduler used
+        # The frames, transfers and waits are counted in the display's stats() under 'play_animation'
+        display = display or LEDMatrix.default_display
+        if (display.width, display.height) != (self.width, self.height):
+            raise ValueError("animation for %d x %d matrices, display of %d x %d"
+                             % (self.width, self.height, display.width, display.height))
+        return display.counted_call('play_animation', self.send_frames, repeats, display)
+
+    def send_frames(self, repeats, display):
+        data = self.data
+        scheduler = LEDMatrix.FrameScheduler(0)
+        scheduler.start()
+        counter = repeats
+        try:
+            while counter > 0 or repeats <= 0:
+                for duration, transfers in self.frames:
+                    with display.lock:
+                        display.current_stats().frames += 1
+                        for start, end in transfers:
+                            display.transfer(list(bytearray(data[start:end])))
+                    scheduler.period = duration
+                    overruns = scheduler.overruns
+                    start = LEDMatrix.clock()
+                    scheduler.wait()
+                    display.count_wait(LEDMatrix.clock() - start, scheduler.overruns - overruns)
+                counter -= 1
+        finally:
+            # the transfers bypassed the display's shadow registers
+            display.invalidate_shadow()
+        return scheduler
+
+    def close(self):
+        self.data.close()
+
+
+def compile_animation(path, frames, speed=3, width=None, height=None, topology=None, pixels_per_frame=1):
+    # Compile an iterable of frames (eg LEDMatrix.scroll_message_horiz_frames(...)) into the file path, each frame
+    # lasting as set by speed: 0-9 for practical purposes; speed does not have to integral; or a FrameScheduler
+    # pixels_per_frame: the number of pixels each frame moves the content by, which sets the period of a
+    # FrameScheduler.pps() (see multilineMAX7219.frame_scheduler()), eg LEDMatrix.RAIN_PIXELS_PER_FRAME for the
+    # frames of gfx_effect_rain_frames()
+    # width, height, topology: the size of the array in matrices and its wiring, by default those of the library's
+    # default display
+    # Note: an indefinitely repeating animation (repeats=0) never ends, so compile a finite number of repeats
+    if width is None and height is None and topology is None:
+        topology = LEDMatrix.default_display.topology
+    width = width or LEDMatrix.default_display.width
+    height = height or LEDMatrix.default_display.height
+    period = LEDMatrix.frame_scheduler(speed, pixels_per_frame).period
+    with AnimationWriter(path, width, height, topology) as writer:
+        for frame in frames:
+            writer.add_frame(frame, period)
+    return writer.frames
+
+
+def play_animation(path, repeats=1, display=None):
+    # Play a compiled animation file, see Animation.play()
+    animation = Animation(path)
+    try:
+        return animation.play(repeats, display)
+    finally:
+        animation.close()
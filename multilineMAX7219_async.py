@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# Filename: multilineMAX7219_async.py
+# ---------------------------------------------------------
+# asyncio versions of the animation functions in the
+# multilineMAX7219.py library
+# ---------------------------------------------------------
+# The animation functions of the library (scroll_message_horiz(),
+#   scroll_message_vert(), gfx_scroll_towards(), gfx_effect_wipe(),
+#   gfx_effect_rain() & static_message() with a delay) wait between
+#   frames with time.sleep(), blocking an asyncio event loop.
+# The coroutines here take the same arguments, but:
+# - each frame is packed on the event loop's thread, and sent via
+#   SPI in the loop's default executor, so the loop is not blocked
+#   by the transfer
+# - between frames they yield to the event loop with asyncio.sleep(),
+#   paced by the same FrameScheduler deadlines as the library
+# - they can be cancelled (eg with asyncio.wait_for() or
+#   task.cancel()): the frame being sent is completed, and the
+#   array is left in a defined state (see each coroutine) before
+#   asyncio.CancelledError is re-raised
+# Use eg:
+#     import multilineMAX7219 as LEDMatrix
+#     import multilineMAX7219_async as LEDMatrixAsync
+#     LEDMatrix.init()
+#     await LEDMatrixAsync.scroll_message_horiz(["This is line 1", "Sample Text"], repeats=1)
+# Each coroutine drives the default display of the library, or
+#   the Display given as its display argument, eg
+#     await LEDMatrixAsync.static_message("Hello", display=panel)
+# Only one animation should run at a time on each Display: they
+#   share its graphics buffer and its array
+# ---------------------------------------------------------
+# Requires:
+# - python 3.7 or later
+# - multilineMAX7219.py library file
+# ---------------------------------------------------------
+
+import asyncio
+
+import multilineMAX7219 as LEDMatrix
+from multilineMAX7219 import DIR_L, DIR_R, DIR_U, DIR_RD, GFX_OFF
+
+
+async def run_in_executor(function, *args):
+    # Run a blocking library function in the event loop's default executor
+    # If the calling task is cancelled meanwhile, the function is still completed before CancelledError is raised,
+    # so that a transfer is never left half-done
+    future = asyncio.get_running_loop().run_in_executor(None, function, *args)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
+
+async def play(frames, speed, finish=None, display=None, name='play', pixels_per_frame=1):
+    # Send each frame from an iterable of frames (see multilineMAX7219.play()), yielding to the event loop while
+    # each frame is sent and until its deadline; returns the FrameScheduler used
+    # speed: 0-9 for practical purposes; speed does not have to integral; or a FrameScheduler
+    # pixels_per_frame: the number of pixels each frame moves the content by (see multilineMAX7219.frame_scheduler())
+    # finish: optional blocking function putting the array into a defined state if the task is cancelled
+    # The frame hooks of the display (see multilineMAX7219.Display.add_frame_hook()) are fired as by the library, and
+    # the frames, transfers and waits (including finish) are counted in its stats() as one call of the function name
+    display = display or LEDMatrix.default_display
+    scheduler = LEDMatrix.frame_scheduler(speed, pixels_per_frame)
+    scheduler.start()
+    frames = iter(frames)
+    pack = lambda: next(frames)
+    index = 0
+    stats = LEDMatrix.Stats()
+    start = LEDMatrix.clock()
+    try:
+        while True:
+            frame, info = display.call_in_stats(stats, name, display.pack_frame, pack, index)
+            if frame is None:
+                break
+            await run_in_executor(display.call_in_stats, stats, name, display.send_packed_frame, frame, info)
+            index += 1
+            overruns = scheduler.overruns
+            wait_start = LEDMatrix.clock()
+            await asyncio.sleep(scheduler.delay())
+            display.call_in_stats(stats, name, display.count_wait, LEDMatrix.clock() - wait_start,
+                                  scheduler.overruns - overruns)
+    except asyncio.CancelledError:
+        if finish is not None:
+            await asyncio.shield(asyncio.get_running_loop().run_in_executor(
+                None, display.call_in_stats, stats, name, finish))
+        raise
+    finally:
+        display.add_stats(name, stats, LEDMatrix.clock() - start)
+    return scheduler
+
+def finish_frames(display, frames):
+    # Return a finish function for play() which skips to the end of an animation: the remaining frames are generated
+    # (so the graphics buffer ends up as if the animation had completed) and only the last one is sent
+    def finish():
+        last = None
+        for last in frames:
+            pass
+        if last is not None:
+            display.send_frame(last)
+    return finish
+
+async def static_message(message, direction=DIR_RD, delay=0, font=None, display=None):
+    # Awaitable multilineMAX7219.static_message()
+    # If cancelled, the rest of the message is displayed at once
+    display = display or LEDMatrix.default_display
+    if not delay:
+        await run_in_executor(display.static_message, message, direction, 0, font)
+        return
+    frames = display.static_message_frames(message, direction, font)
+    scheduler = delay if isinstance(delay, LEDMatrix.FrameScheduler) else LEDMatrix.FrameScheduler(delay)
+    def send_remaining_frames():
+        for frame in frames:
+            display.send_frame(frame)
+    return await play(frames, scheduler, send_remaining_frames, display, 'static_message')
+
+async def scroll_message_horiz(messages, repeats=0, speed=3, direction=DIR_L, font=None, finish=True, display=None):
+    # Awaitable multilineMAX7219.scroll_message_horiz()
+    # If cancelled with finish=True, the array is cleared; with finish=False it keeps the frame last sent
+    display = display or LEDMatrix.default_display
+    frames = display.scroll_message_horiz_frames(messages, repeats, direction, font)
+    scheduler = await play(frames, speed, display.clear_all if finish else None, display, 'scroll_message_horiz')
+    if finish:
+        await run_in_executor(display.clear_all)
+    return scheduler
+
+async def scroll_message_vert(old_message, new_message, speed=3, direction=DIR_U, font=None, finish=True, display=None):
+    # Awaitable multilineMAX7219.scroll_message_vert()
+    # If cancelled with finish=True, new_message is displayed at once; with finish=False the array keeps the frame
+    # last sent
+    display = display or LEDMatrix.default_display
+    def show_new_message():
+        display.static_message(new_message, font=font)
+    frames = display.scroll_message_vert_frames(old_message, new_message, direction, font)
+    scheduler = await play(frames, speed, show_new_message if finish else None, display, 'scroll_message_vert')
+    if finish:
+        await run_in_executor(show_new_message)
+    return scheduler
+
+async def shift_letters(curr_letters, next_letters, speed=3, direction=DIR_L, font=None, display=None):
+    # Awaitable multilineMAX7219.shift_letters()
+    # If cancelled, next_letters are displayed at once
+    display = display or LEDMatrix.default_display
+    def show_next_letters():
+        display.send_matrix_shifted_letters(curr_letters, next_letters, 8, direction, font)
+    frames = display.shift_letters_frames(curr_letters, next_letters, direction, font)
+    return await play(frames, speed, show_next_letters, display, 'shift_letters')
+
+async def gfx_scroll_towards(new_graphic=GFX_OFF, repeats=0, speed=3, direction=DIR_L, finish=True, display=None):
+    # Awaitable multilineMAX7219.gfx_scroll_towards()
+    # If cancelled, the array shows the graphics buffer as it was left by the last frame generated
+    display = display or LEDMatrix.default_display
+    frames = display.gfx_scroll_towards_frames(new_graphic, repeats, direction)
+    return await play(frames, speed, display.gfx_render, display, 'gfx_scroll_towards')
+
+async def gfx_effect_wipe(new_graphic, speed=3, transition=DIR_R, display=None):
+    # Awaitable multilineMAX7219.gfx_effect_wipe()
+    # If cancelled, the effect skips to its end: new_graphic is displayed and held in the graphics buffer
+    display = display or LEDMatrix.default_display
+    frames = display.gfx_effect_wipe_frames(new_graphic, transition)
+    return await play(frames, speed, finish_frames(display, frames), display, 'gfx_effect_wipe')
+
+async def gfx_effect_rain(new_graphic, speed=3, seed=None, display=None):
+    # Awaitable multilineMAX7219.gfx_effect_rain()
+    # If cancelled, the effect skips to its end: new_graphic is displayed and held in the graphics buffer
+    display = display or LEDMatrix.default_display
+    frames = display.gfx_effect_rain_frames(new_graphic, seed)
+    return await play(frames, speed, finish_frames(display, frames), display, 'gfx_effect_rain',
+                      LEDMatrix.RAIN_PIXELS_PER_FRAME)
+
+async def gfx_render(display=None):
+    # Awaitable multilineMAX7219.gfx_render(): sends the graphics buffer without blocking the event loop
+    display = display or LEDMatrix.default_display
+    await run_in_executor(display.gfx_render)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# ---------------------------------------------------------
+# Filename: multilineMAX7219_benchmark.py
+# ---------------------------------------------------------
+# Benchmarks of the multilineMAX7219.py library
+# ---------------------------------------------------------
+# Runs each animation and drawing function of the library on
+#   arrays of several sizes, without any hardware: the transfers
+#   go to a CountingTransport, which only counts them, and the
+#   animations are paced by a FrameScheduler with a period of 0,
+#   so they never sleep. For each function and size it measures:
+#   - fps                 : frames per second
+#   - cpu_per_frame       : CPU time per frame (seconds)
+#   - transfers_per_frame : SPI transfers per frame
+#   - bytes_per_frame     : bytes sent per frame
+# The results are printed, and saved as JSON to compare versions
+#   of the library, eg
+#     python multilineMAX7219_benchmark.py -o before.json
+#     ...change the library...
+#     python multilineMAX7219_benchmark.py -o after.json -c before.json
+# Options: -s 1x1,4x2 : only these sizes (width x height)
+#          -e gfx_render,gfx_scroll : only these functions
+# ---------------------------------------------------------
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import multilineMAX7219 as LEDMatrix
+from multilineMAX7219 import DIR_L, DIR_R, DIR_U, DIR_D, GFX_ON, GFX_OFF
+
+# Sizes of array benchmarked by default, as (width, height) in matrices
+BENCHMARK_SIZES = [(1, 1), (2, 1), (3, 3), (4, 2), (8, 4), (16, 8)]
+# Number of frames drawn by the functions which draw one frame per call
+BENCHMARK_FRAMES = 100
+
+# CPU time used by the process (time.clock() on Python versions without time.process_time())
+cpu_clock = getattr(time, 'process_time', None) or time.clock
+
+
+class CountingTransport(object):
+    # Transport which only counts the transfers and bytes sent to it, so the benchmarks time the library alone
+    def __init__(self):
+        self.transfers = 0
+        self.bytes_sent = 0
+
+    def xfer(self, data):
+        return self.xfer2(data)
+
+    def xfer2(self, data):
+        self.transfers += 1
+        self.bytes_sent += len(data)
+        return data
+
+    def close(self):
+        pass
+
+
+def no_wait():
+    # FrameScheduler which never sleeps: every deadline is already due
+    return LEDMatrix.FrameScheduler(0)
+
+# Each benchmark runs a function on a display, and returns the number of frames sent
+
+def bench_scroll_message_horiz(display):
+    messages = ["Benchmark %d" % line for line in range(display.height)]
+    return display.scroll_message_horiz(messages, 1, no_wait(), DIR_L).frames
+
+def bench_scroll_message_vert(display):
+    frames = 0
+    for direction in (DIR_U, DIR_D):
+        old_message = "".join(chr(65 + matrix % 26) for matrix in range(display.num_matrices))
+        frames += display.scroll_message_vert(old_message, old_message.lower(), no_wait(), direction).frames
+    return frames
+
+def bench_static_message(display):
+    messages = ["".join(chr(48 + (matrix + frame) % 10) for matrix in range(display.num_matrices))
+                for frame in range(2)]
+    for frame in range(BENCHMARK_FRAMES):
+        display.static_message(messages[frame % 2])
+    return BENCHMARK_FRAMES
+
+def bench_gfx_render(display):
+    for frame in range(BENCHMARK_FRAMES):
+        display.gfx_set_all(GFX_ON if frame % 2 else GFX_OFF)
+        display.gfx_render()
+    return BENCHMARK_FRAMES
+
+def bench_gfx_scroll(display):
+    # A checkerboard, fed its own edge as it scrolls, so each frame inverts every pixel and changes every register
+    checkers = [[[(x + y + phase) % 2 for y in range(8*display.height)] for x in range(8*display.width)]
+                for phase in range(2)]
+    display.gfx_sprite_array(checkers[0], 0, 0, GFX_ON)
+    for frame in range(BENCHMARK_FRAMES):
+        display.gfx_scroll(DIR_L if frame % 2 else DIR_U, checkers[frame % 2])
+        display.gfx_render()
+    return BENCHMARK_FRAMES
+
+def bench_gfx_effect_wipe(display):
+    frames = 0
+    for transition in (DIR_R, DIR_D):
+        for graphic in (GFX_ON, GFX_OFF):
+            frames += display.gfx_effect_wipe(graphic, no_wait(), transition).frames
+    return frames
+
+def bench_gfx_effect_rain(display):
+    graphic = [[(x + y) % 2 for y in range(8*display.height)] for x in range(8*display.width)]
+    return display.gfx_effect_rain(graphic, no_wait(), 0).frames
+
+def bench_gfx_scroll_towards(display):
+    frames = 0
+    for direction in (DIR_L, DIR_R, DIR_U, DIR_D):
+        frames += display.gfx_scroll_towards(GFX_ON if direction in (DIR_L, DIR_U) else GFX_OFF, 1, no_wait(),
+                                             direction).frames
+    return frames
+
+BENCHMARKS = [
+    ('scroll_message_horiz', bench_scroll_message_horiz),
+    ('scroll_message_vert',  bench_scroll_message_vert),
+    ('static_message',       bench_static_message),
+    ('gfx_render',           bench_gfx_render),
+    ('gfx_scroll',           bench_gfx_scroll),
+    ('gfx_effect_wipe',      bench_gfx_effect_wipe),
+    ('gfx_effect_rain',      bench_gfx_effect_rain),
+    ('gfx_scroll_towards',   bench_gfx_scroll_towards),
+    ]
+
+def run_benchmark(name, function, width, height):
+    # Run one benchmark on a new width x height display; returns its result as a dict
+    transport = CountingTransport()
+    display = LEDMatrix.Display(width, height, transport)
+    display.init()
+    display.clear_all()
+    transport.transfers = transport.bytes_sent = 0
+    start_cpu = cpu_clock()
+    start = LEDMatrix.clock()
+    frames = function(display)
+    seconds = LEDMatrix.clock() - start
+    cpu_seconds = cpu_clock() - start_cpu
+    frames = max(frames, 1)
+    return {
+        'function': name,
+        'size': '%dx%d' % (width, height),
+        'frames': frames,
+        'seconds': seconds,
+        'fps': frames / seconds if seconds > 0 else None,
+        'cpu_per_frame': cpu_seconds / frames,
+        'transfers_per_frame': float(transport.transfers) / frames,
+        'bytes_per_frame': float(transport.bytes_sent) / frames,
+        }
+
+def run_benchmarks(sizes=BENCHMARK_SIZES, names=None, report=None):
+    # Run the benchmarks (all, or those named in names) on each size; returns the results as a list of dicts
+    # report: optional function called with each result as it is measured
+    results = []
+    for width, height in sizes:
+        for name, function in BENCHMARKS:
+            if names and name not in names:
+                continue
+            result = run_benchmark(name, function, width, height)
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+def print_result(result, baseline=None):
+    # Print one result; with the matching result of a baseline, also the ratio of the CPU time per frame
+    line = "%-22s %6s %7d frames %10.1f fps %9.1f us/frame %6.1f transfers %8.1f bytes" % (
+        result['function'], result['size'], result['frames'], result['fps'] or 0,
+        result['cpu_per_frame'] * 1000000, result['transfers_per_frame'], result['bytes_per_frame'])
+    if baseline is not None and baseline['cpu_per_frame'] > 0:
+        line += "  CPU x%.2f" % (result['cpu_per_frame'] / baseline['cpu_per_frame'])
+    print(line)
+
+def parse_sizes(text):
+    # Parse sizes given as eg "1x1,4x2" into [(1, 1), (4, 2)]
+    return [tuple(int(number) for number in size.split('x')) for size in text.split(',')]
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the multilineMAX7219 library without hardware")
+    parser.add_argument('-s', '--sizes', type=parse_sizes, default=BENCHMARK_SIZES,
+                        help="sizes of array, eg 1x1,4x2 (default: %s)"
+                             % ",".join("%dx%d" % size for size in BENCHMARK_SIZES))
+    parser.add_argument('-e', '--functions', help="functions to benchmark, eg gfx_render,gfx_scroll (default: all)")
+    parser.add_argument('-o', '--output', help="file to save the results in, as JSON")
+    parser.add_argument('-c', '--compare', help="JSON file of earlier results to compare with")
+    options = parser.parse_args(args)
+    baselines = {}
+    if options.compare:
+        with open(options.compare) as compare_file:
+            for result in json.load(compare_file)['results']:
+                baselines[(result['function'], result['size'])] = result
+    names = options.functions.split(',') if options.functions else None
+    def report(result):
+        print_result(result, baselines.get((result['function'], result['size'])))
+        sys.stdout.flush()
+    results = run_benchmarks(options.sizes, names, report)
+    if options.output:
+        with open(options.output, 'w') as output_file:
+            json.dump({'python': platform.python_version(), 'gfx_numpy': LEDMatrix.GFX_NUMPY,
+                       'results': results}, output_file, indent=1, sort_keys=True)
+    return results
+
+if __name__ == "__main__":
+    main()
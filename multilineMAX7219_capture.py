@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# ---------------------------------------------------------
+# Filename: multilineMAX7219_capture.py
+# ---------------------------------------------------------
+# Capture and replay of the SPI traffic of the
+# multilineMAX7219.py library
+# ---------------------------------------------------------
+# CaptureTransport is a transport (see multilineMAX7219_transport.py)
+#   which writes every transfer, with the time it was made, to a
+#   capture file, and passes it on to another transport, eg
+#     import multilineMAX7219 as LEDMatrix
+#     from multilineMAX7219_capture import CaptureTransport, replay_capture
+#     from multilineMAX7219_transport import FakeTransport, SpidevTransport
+#     LEDMatrix.set_transport(CaptureTransport("wipe.cap", FakeTransport(LEDMatrix.NUM_MATRICES)))
+#     LEDMatrix.init()
+#     LEDMatrix.gfx_effect_wipe(LEDMatrix.GFX_ON)
+#     LEDMatrix.get_transport().close()
+# The capture can then be inspected with read_capture(), eg
+#     for seconds, method, data in read_capture("wipe.cap"): ...
+#   or replayed to the hardware or to a FakeTransport, either at
+#   the pace it was captured or as fast as possible:
+#     replay_capture("wipe.cap", SpidevTransport(0, 0))
+#     replay_capture("wipe.cap", FakeTransport(LEDMatrix.NUM_MATRICES), realtime=False)
+# ---------------------------------------------------------
+# File format (all numbers little-endian):
+# - header: 8 bytes 'MX7219CP', format version (1 byte)
+# - each transfer: the time since the capture started in
+#   microseconds (8 bytes), the method (1 byte: 0 for xfer, 1 for
+#   xfer2), its length (2 bytes) and the bytes sent
+# ---------------------------------------------------------
+
+import struct
+import time
+
+import multilineMAX7219 as LEDMatrix
+
+CAPTURE_MAGIC   = b'MX7219CP'
+CAPTURE_VERSION = 2
+CAPTURE_HEADER  = struct.Struct('<8sB')  # magic, version
+CAPTURE_XFER    = struct.Struct('<QBH')  # time (microseconds), method, length
+# Records of each format version, still read by read_capture(); version 1 timed them in 4 bytes, which overflowed
+# after 71 minutes
+CAPTURE_XFERS   = {1: struct.Struct('<IBH'), CAPTURE_VERSION: CAPTURE_XFER}
+CAPTURE_METHODS = ('xfer', 'xfer2')
+
+
+class CaptureTransport(object):
+    # Writes every transfer, timed from the creation of the transport, to the capture file path
+    # target: optional transport (eg a SpidevTransport or FakeTransport) to which each transfer is passed on
+    # transfers, bytes_sent: the number of transfers and bytes captured so far
+    # close() completes the capture file, and closes the target
+    def __init__(self, path, target=None):
+        self.target = target
+        self.transfers = 0
+        self.bytes_sent = 0
+        self.file = open(path, 'wb')
+        self.file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION))
+        self.start = LEDMatrix.clock()
+
+    def capture(self, method, data):
+        data = bytearray(byte & 0xFF for byte in data)
+        microseconds = int((LEDMatrix.clock() - self.start) * 1000000)
+        self.file.write(CAPTURE_XFER.pack(microseconds, CAPTURE_METHODS.index(method), len(data)))
+        self.file.write(data)
+        self.transfers += 1
+        self.bytes_sent += len(data)
+        if self.target is not None:
+            return getattr(self.target, method)(list(data))
+        return [0] * len(data)
+
+    def xfer(self, data):
+        return self.capture('xfer', data)
+
+    def xfer2(self, data):
+        return self.capture('xfer2', data)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.target is not None:
+            self.target.close()
+
+
+def read_capture(path):
+    # Generate the transfers of a capture file, each as a (seconds since the capture started, method name, bytes)
+    # tuple, eg (0.25, 'xfer2', b'\x01\x00...')
+    with open(path, 'rb') as capture_file:
+        header = capture_file.read(CAPTURE_HEADER.size)
+        if len(header) < CAPTURE_HEADER.size:
+            raise ValueError("%s is not an SPI capture: too short for its header" % path)
+        magic, version = CAPTURE_HEADER.unpack(header)
+        if magic != CAPTURE_MAGIC or version not in CAPTURE_XFERS:
+            raise ValueError("%s is not an SPI capture of a known version (magic %r, version %d)"
+                             % (path, magic, version))
+        xfer = CAPTURE_XFERS[version]
+        while True:
+            record = capture_file.read(xfer.size)
+            if len(record) < xfer.size:
+                return
+            microseconds, method, length = xfer.unpack(record)
+            data = capture_file.read(length)
+            if len(data) != length:
+                raise ValueError("%s is truncated: the last transfer has %d of its %d bytes" % (path, len(data), length))
+            yield microseconds / 1000000.0, CAPTURE_METHODS[method], data
+
+
+def replay_capture(path, transport, realtime=True):
+    # Send the transfers of a capture file to transport (eg a SpidevTransport or FakeTransport), with the same timing
+    # as when they were captured, or with realtime=False as fast as possible; returns the number of transfers sent
+    # The transport is not closed afterwards
+    start = LEDMatrix.clock()
+    transfers = 0
+    for seconds, method, data in read_capture(path):
+        if realtime:
+            wait = start + seconds - LEDMatrix.clock()
+            if wait > 0:
+                time.sleep(wait)
+        getattr(transport, method)(list(bytearray(data)))
+        transfers += 1
+    return transfers
@@ -100,9 +100,7 @@ try:
 	LEDMatrix.static_message("Floor: " + Floors[0])
 	time.sleep(1)
 	for floor, display in enumerate(Floors[:-1]):
-		for stage in range(8):
-			LEDMatrix.send_matrix_shifted_letter(3, ord(display), ord(Floors[floor+1]), stage, DIR_D)
-			time.sleep(0.1)
+		LEDMatrix.shift_letters({3: display}, {3: Floors[floor+1]}, LEDMatrix.FrameScheduler(0.1), DIR_D)
 	LEDMatrix.static_message("Floor: " + Floors[-1])
 	time.sleep(1)
 	LEDMatrix.clear_all()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# ---------------------------------------------------------
+# Filename: multilineMAX7219_transport.py
+# ---------------------------------------------------------
+# Transports for the multilineMAX7219.py library: the objects
+# which carry the bytes from the library to the MAX7219 chain
+# ---------------------------------------------------------
+# A transport is any object with the two methods the library
+#   uses (named as in spidev, so a spidev.SpiDev object can be
+#   used as a transport directly):
+#   xfer(bytes)  : send bytes deasserting CS/CE after every byte
+#   xfer2(bytes) : send bytes only de-asserting CS/CE at end
+#   and a close() method
+# - SpidevTransport   : the SPI bus of the Raspberry Pi (default)
+# - FakeTransport     : no hardware; decodes the register writes
+#                       into the state of each chip, in memory
+# - RecordingTransport: records every transfer, optionally
+#                       passing it on to another transport
+# - SplitTransport    : one logical chain split across several
+#                       chains (eg one per row of matrices, on
+#                       CE0, CE1 and SPI1), each with its own
+#                       transport, sent to concurrently, eg
+#     multilineMAX7219.Display(8, 3, SplitTransport.by_rows(8, 3,
+#         [SpidevTransport(0, 0), SpidevTransport(0, 1), SpidevTransport(1, 0)]))
+#   A display with another Topology passes it to by_rows() as well
+# Select a transport with multilineMAX7219.set_transport() before
+#   calling init(); without one, init() opens SpidevTransport on
+#   bus 0 / CE0 on first use
+# ---------------------------------------------------------
+# Requires:
+# - py-spidev module for SpidevTransport only
+# ---------------------------------------------------------
+
+import threading
+
+
+class SpidevTransport(object):
+    # SPI bus of the Raspberry Pi via the spidev module, opened on creation
+    # bus, device: eg 0, 0 for SPI0 with CE0 (the wiring described in multilineMAX7219.py), 0, 1 for CE1
+    def __init__(self, bus=0, device=0):
+        import spidev
+        self.bus = bus
+        self.device = device
+        self.spi = spidev.SpiDev()
+        self.spi.open(bus, device)
+
+    def xfer(self, data):
+        return self.spi.xfer(list(data))
+
+    def xfer2(self, data):
+        return self.spi.xfer2(list(data))
+
+    def close(self):
+        self.spi.close()
+
+
+class FakeTransport(object):
+    # In-memory chain of num_matrices MAX7219 chips, for running the library without any hardware
+    # Each transfer is shifted through the chain 16 bits per chip, as by the real chips, and latched when CS rises:
+    # - registers[matrix][register] : the data last latched into each register of each chip (None: never written),
+    #                                 matrix 0 being the chip nearest the Pi
+    # - transfers, bytes_sent       : the number of transfers and bytes received so far (see reset_counters())
+    def __init__(self, num_matrices):
+        self.num_matrices = num_matrices
+        self.registers = [[None] * 16 for matrix in range(num_matrices)]
+        # the 16-bit word held in each chip's shift register
+        self.shift_words = [(0, 0)] * num_matrices
+        self.transfers = 0
+        self.bytes_sent = 0
+
+    def xfer(self, data):
+        return self.xfer2(data)
+
+    def xfer2(self, data):
+        data = [byte & 0xFF for byte in data]
+        self.transfers += 1
+        self.bytes_sent += len(data)
+        # the last word sent ends up in the chip nearest the Pi, pushing the earlier words further along the chain
+        # (an odd byte is shifted in as half a word, as it would be by the chips)
+        if len(data) % 2:
+            bits = 0
+            for byte in [word_byte for word in reversed(self.shift_words) for word_byte in word] + data:
+                bits = (bits << 8) | byte
+            bits &= (1 << (16 * self.num_matrices)) - 1
+            self.shift_words = [((bits >> (16*matrix + 8)) & 0xFF, (bits >> (16*matrix)) & 0xFF)
+                                for matrix in range(self.num_matrices)]
+        else:
+            words = [(data[i], data[i+1]) for i in range(len(data) - 2, -1, -2)]
+            self.shift_words = (words + self.shift_words)[:self.num_matrices]
+        for matrix, (register, value) in enumerate(self.shift_words):
+            register &= 0x0F
+            if register != 0:
+                self.registers[matrix][register] = value
+        return [0] * len(data)
+
+    def close(self):
+        pass
+
+    def columns(self, matrix):
+        # The 8 column bytes displayed by a chip (as sent: MSB = bottom row), 0 for columns never written
+        if self.registers[matrix][0x0F]:
+            return [0xFF] * 8
+        if not self.registers[matrix][0x0C]:
+            return [0] * 8
+        return [self.registers[matrix][col + 1] or 0 for col in range(8)]
+
+    def reset_counters(self):
+        self.transfers = 0
+        self.bytes_sent = 0
+
+
+class RecordingTransport(object):
+    # Records every transfer in log, as a (method name, bytes) tuple, eg ('xfer2', b'\x01\x00...')
+    # target: optional transport (eg a SpidevTransport or FakeTransport) to which each transfer is passed on
+    # transfers, bytes_sent: the number of transfers and bytes so far; clear() empties log and resets them
+    def __init__(self, target=None):
+        self.target = target
+        self.log = []
+        self.transfers = 0
+        self.bytes_sent = 0
+
+    def record(self, method, data):
+        data = bytearray(byte & 0xFF for byte in data)
+        self.log.append((method, bytes(data)))
+        self.transfers += 1
+        self.bytes_sent += len(data)
+        if self.target is not None:
+            return getattr(self.target, method)(list(data))
+        return [0] * len(data)
+
+    def xfer(self, data):
+        return self.record('xfer', data)
+
+    def xfer2(self, data):
+        return self.record('xfer2', data)
+
+    def close(self):
+        if self.target is not None:
+            self.target.close()
+
+    def clear(self):
+        del self.log[:]
+        self.transfers = 0
+        self.bytes_sent = 0
+
+
+class ChainWorker(threading.Thread):
+    # Worker thread sending the transfers of one chain of a SplitTransport
+    def __init__(self, transport):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.transport = transport
+        self.data = None
+        self.error = None
+        self.request = threading.Event()
+        self.done = threading.Event()
+        self.start()
+
+    def send(self, data):
+        # Start sending data, without waiting for the transfer (see wait())
+        self.data = data
+        self.done.clear()
+        self.request.set()
+
+    def wait(self):
+        # Wait for the transfer started by send(); an exception raised by the transport is raised here
+        self.done.wait()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def stop(self):
+        self.send(None)
+        self.join()
+
+    def run(self):
+        while True:
+            self.request.wait()
+            self.request.clear()
+            if self.data is None:
+                self.done.set()
+                return
+            try:
+                self.transport.xfer2(self.data)
+            except Exception as error:
+                self.error = error
+            self.done.set()
+
+
+class SplitTransport(object):
+    # One logical chain of num_matrices matrices (as seen by the library), made of several physical chains
+    # chains: a list of (transport, matrices) tuples, one per physical chain, where matrices lists the positions along
+    #         the logical chain of the chips on that chain, starting with the chip nearest the Pi; see also by_rows()
+    #         (with the default COLUMN_MAJOR Topology of the library, the positions are the matrix numbers)
+    # Each transfer for the logical chain is split into one transfer per physical chain. Chains whose part of it is
+    # all NO_OP are not sent to; the others are sent to concurrently by worker threads, and the transfer is complete
+    # once all of them are
+    # A transfer shorter than the logical chain (eg from send_reg_byte()) is addressed to the matrices nearest the
+    # start of the logical chain, without shifting the others along as a single chain would
+    def __init__(self, num_matrices, chains):
+        self.num_matrices = num_matrices
+        self.transports = [transport for transport, matrices in chains]
+        # index_lists[chain]: for each byte of the chain's transfer, the index of that byte in the logical transfer
+        # (the words of the logical transfer are for matrix num_matrices-1 first, down to matrix 0)
+        self.index_lists = []
+        for transport, matrices in chains:
+            index_list = []
+            for matrix in reversed(matrices):
+                index_list += [2 * (num_matrices - 1 - matrix), 2 * (num_matrices - 1 - matrix) + 1]
+            self.index_lists.append(index_list)
+        self.workers = [ChainWorker(transport) for transport in self.transports]
+
+    @classmethod
+    def by_rows(cls, width, height, transports, topology=None):
+        # SplitTransport for an array of width x height matrices wired as one chain per row of matrices
+        # transports: one per row, starting with the bottom row; the left-hand matrix of a row is nearest the Pi
+        # topology: the Topology of the display (see multilineMAX7219.Topology), which sets the position of each
+        #           matrix along the logical chain; None for the default COLUMN_MAJOR order
+        if topology is None:
+            positions = [[l_col*height + l_row for l_row in range(height)] for l_col in range(width)]
+        elif (topology.width, topology.height) != (width, height):
+            raise ValueError("topology for %d x %d matrices, array of %d x %d"
+                             % (topology.width, topology.height, width, height))
+        else:
+            positions = topology.cell_positions
+        return cls(width * height, [(transports[l_row], [positions[l_col][l_row] for l_col in range(width)])
+                                    for l_row in range(height)])
+
+    def xfer(self, data):
+        return self.xfer2(data)
+
+    def xfer2(self, data):
+        data = list(data)
+        if len(data) < 2 * self.num_matrices:
+            data = [0] * (2 * self.num_matrices - len(data)) + data
+        active = []
+        for chain, index_list in enumerate(self.index_lists):
+            chain_data = [data[i] for i in index_list]
+            if any(register & 0x0F for register in chain_data[0::2]):
+                active.append((chain, chain_data))
+        if not active:
+            return [0] * len(data)
+        # the calling thread sends one chain's transfer itself, the worker threads send the others meanwhile
+        for chain, chain_data in active[1:]:
+            self.workers[chain].send(chain_data)
+        error = None
+        try:
+            chain, chain_data = active[0]
+            self.transports[chain].xfer2(chain_data)
+        except Exception as chain_error:
+            error = chain_error
+        for chain, chain_data in active[1:]:
+            try:
+                self.workers[chain].wait()
+            except Exception as chain_error:
+                error = error or chain_error
+        if error is not None:
+            raise error
+        return [0] * len(data)
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+        for transport in self.transports:
+            transport.close()